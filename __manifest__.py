@@ -1,6 +1,6 @@
 {
   'name': 'Jorels Api Connection by Grupo Quanam Colombia',
-  'version': '1.0',
+  'version': '1.4',
   'description': 'This module connect the Jorels Api to Payroll_Quanamco Module',
   'summary': '',
   'author': 'Grupo Quanam Colombia SAS',
@@ -16,6 +16,8 @@
   'data': [
     # Security
     'security/ir.model.access.csv',
+    'security/pdf_export_security.xml',
+    'data/ir_cron.xml',
     'report/hr_payslip_edi_report.xml',
     'views/action_menus.xml',
     'views/edi_gen_views.xml',
@@ -23,6 +25,7 @@
     'views/hr_payslip_edi_views.xml',
     'views/hr_payslip_views.xml',
     'views/hr_salary_rule_views.xml',
+    'views/pdf_export_views.xml',
     'views/res_config_settings_views.xml',
   ],
   # 'demo': [
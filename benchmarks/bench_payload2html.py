@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+
+"""
+Benchmark of the payload HTML renderer on a consolidated payload of 200 lines,
+against the previous recursive string concatenation renderer.
+
+It does not need Odoo, run it with:
+
+    python benchmarks/bench_payload2html.py
+"""
+
+import importlib.util
+import os
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_tool(name):
+    path = os.path.join(HERE, os.pardir, "tools", name + ".py")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+payload_html = load_tool("payload_html")
+
+CODE_MODELS = {
+    "payroll_period_code": "payroll_periods",
+    "currency_code": "type_currencies",
+    "id_code": "type_document_identifications",
+    "municipality_code": "municipalities",
+    "type_worker_code": "type_workers",
+    "subtype_worker_code": "subtype_workers",
+    "country_code": "countries",
+    "contract_code": "type_contracts",
+    "_payment_code": "payment_forms",
+    "_payment_method_code": "payment_methods",
+    "time_code": "type_times",
+    "incapacity_code": "type_incapacities",
+}
+CODE_NAMES = {
+    model: {index: "%s %s" % (model, index) for index in range(1, 1200)}
+    for model in CODE_MODELS.values()
+}
+FIELD_NAMES = {
+    "_earn": "Earn",
+    "_deduction": "Deduction",
+    "overtimes_surcharges": "Overtimes and surcharges",
+    "start": "Start",
+    "end": "End",
+    "quantity": "Quantity",
+    "payment": "Payment",
+    "time_code": "Overtime and surcharges type",
+}
+
+
+def consolidated_payload(lines=200):
+    """A consolidated payload with the given number of detail lines."""
+    overtimes = [
+        {
+            "start": "2024-01-%02d 18:00:00" % (index % 28 + 1),
+            "end": "2024-01-%02d 20:00:00" % (index % 28 + 1),
+            "quantity": 2.0,
+            "time_code": index % 7 + 1,
+            "payment": 25000.0 + index,
+        }
+        for index in range(lines // 2)
+    ]
+    incapacities = [
+        {
+            "start": "2024-01-%02d" % (index % 28 + 1),
+            "end": "2024-01-%02d" % (index % 28 + 1),
+            "quantity": 1,
+            "incapacity_code": index % 3 + 1,
+            "payment": 40000.0,
+        }
+        for index in range(lines // 4)
+    ]
+    libranzas = [
+        {"description": "Libranza %s" % index, "payment": 1000.0 + index}
+        for index in range(lines // 4)
+    ]
+    return {
+        "sync": False,
+        "accrued_total": 3500000.0,
+        "deductions_total": 280000.0,
+        "total": 3220000.0,
+        "sequence": {"prefix": "NE", "number": 1024},
+        "information": {"payroll_period_code": 5, "currency_code": 35},
+        "employer": {
+            "name": "Company",
+            "id_code": 6,
+            "id_number": "900000000",
+            "country_code": 46,
+            "municipality_code": 149,
+            "address": "Street 1",
+        },
+        "employee": {
+            "type_worker_code": 1,
+            "subtype_worker_code": 1,
+            "high_risk_pension": False,
+            "id_code": 3,
+            "id_number": "1000000",
+            "surname": "Surname",
+            "first_name": "Name",
+            "country_code": 46,
+            "municipality_code": 149,
+            "address": "Street 2",
+            "integral_salary": False,
+            "contract_code": 2,
+            "salary": 3000000.0,
+        },
+        "period": {
+            "admission_date": "2020-01-01",
+            "settlement_start_date": "2024-01-01",
+            "settlement_end_date": "2024-01-31",
+            "amount_time": 1470,
+            "date_issue": "2024-02-01",
+        },
+        "payment": {"code": 1, "method_code": 10},
+        "payment_dates": [{"date": "2024-01-15"}, {"date": "2024-01-31"}],
+        "earn": {
+            "basic": {"worked_days": 30, "worker_salary": 3000000.0},
+            "transports": [{"assistance": 162000.0}],
+            "overtimes_surcharges": overtimes,
+            "incapacities": incapacities,
+        },
+        "deduction": {
+            "health": {"percentage": 4.0, "payment": 120000.0},
+            "pension_fund": {"percentage": 4.0, "payment": 120000.0},
+            "libranzas": libranzas,
+        },
+    }
+
+
+def legacy_payload2html(payload, tab, title=""):
+    """The previous renderer, with the lookups already preloaded."""
+    output = ""
+    output_temp = "<table class='o_group o_inner_group o_group_col_12'><tbody>"
+    for key, value in payload.items():
+        field_name = title + "_" + key
+        if type(value) != dict and type(value) != list:
+            if key == "sync":
+                continue
+            if key[-4:] == "code":
+                model_name = CODE_MODELS.get(field_name) or CODE_MODELS.get(key)
+                if model_name:
+                    value = CODE_NAMES[model_name].get(value, value)
+            output_temp += (
+                "<tr><td class='o_td_label' style='width: 50%;'><label class='o_form_label'><strong>"
+                + legacy_field_name(field_name, key)
+                + "</strong></label></td>"
+                "<td class='text-right' style='width: 100%;'><span class='o_field_char o_field_widget'>"
+                + str(value)
+                + "</span></td><td/></tr>"
+            )
+    if output_temp != "<table class='o_group o_inner_group o_group_col_12'><tbody>":
+        output_temp += "</tbody></table><br/><br/>"
+        output += output_temp
+    for key, value in payload.items():
+        field_name = title + "_" + key
+        if type(value) == dict:
+            if key == "environment":
+                continue
+            output += (
+                "<h" + str(tab) + ">" + legacy_field_name(field_name, key)
+                + "</h" + str(tab) + ">"
+            )
+            output += legacy_payload2html(value, tab + 1, field_name)
+    for key, value in payload.items():
+        field_name = title + "_" + key
+        if type(value) == list:
+            output += (
+                "<h" + str(tab) + ">" + legacy_field_name(field_name, key)
+                + "</h" + str(tab) + ">"
+            )
+            for i, valor in enumerate(value):
+                output += (
+                    "<h" + str(tab + 1) + ">" + str(i + 1) + ". "
+                    + "</h" + str(tab + 1) + ">"
+                )
+                output += legacy_payload2html(valor, tab + 1, field_name)
+    return output
+
+
+def legacy_field_name(field_name, key):
+    if field_name in FIELD_NAMES:
+        return FIELD_NAMES[field_name]
+    elif key in FIELD_NAMES:
+        return FIELD_NAMES[key]
+    return field_name
+
+
+def render(payload):
+    return payload_html.render_payload_html(
+        payload,
+        2,
+        field_names=FIELD_NAMES,
+        code_models=CODE_MODELS,
+        code_names=CODE_NAMES,
+    )
+
+
+def main():
+    payload = consolidated_payload(200)
+    assert render(payload) == legacy_payload2html(payload, 2), "Different markup"
+    number = 200
+    for name, func in (
+        ("legacy", lambda: legacy_payload2html(payload, 2)),
+        ("single traversal", lambda: render(payload)),
+    ):
+        best = min(timeit.repeat(func, number=number, repeat=5))
+        print("%-18s %8.3f ms per payload" % (name, best / number * 1000))
+
+
+if __name__ == "__main__":
+    main()
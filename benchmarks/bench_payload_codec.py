@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+
+"""
+Benchmark of the payload codec backends, the standard library json and orjson,
+serializing and deserializing a consolidated payload of 200 lines, the shape
+stored in 'edi_payload' and sent to the EDIPO API.
+
+It does not need Odoo, run it with:
+
+    python benchmarks/bench_payload_codec.py
+"""
+
+import importlib.util
+import os
+import timeit
+
+# The benchmarks directory is in the path when it is run as a script
+from bench_payload2html import consolidated_payload
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_tool(name):
+    path = os.path.join(HERE, os.pardir, "tools", name + ".py")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+payload_codec = load_tool("payload_codec")
+
+
+def main():
+    payload = consolidated_payload(200)
+    text = payload_codec.json_dumps(payload)
+    backends = [("json", payload_codec.json_dumps, payload_codec.json_loads)]
+    if payload_codec.orjson is not None:
+        assert payload_codec.orjson_dumps(payload) == text, "Different output"
+        # The floats that orjson formats differently, and their text in strings
+        floats = {
+            "values": [1e-05, 2.5e-05, -1e-05, 1e-07, 1e16, 1.5e16, 1e22, 0.0001],
+            "note": "1e16 0.00001",
+        }
+        float_text = payload_codec.json_dumps(floats)
+        assert payload_codec.orjson_dumps(floats) == float_text, "Different floats"
+        assert payload_codec.orjson_loads(float_text) == floats, "Different floats"
+        assert payload_codec.orjson_loads(text) == payload, "Different payload"
+        backends.append(
+            ("orjson", payload_codec.orjson_dumps, payload_codec.orjson_loads)
+        )
+    else:
+        print("orjson is not installed, only the standard library is measured")
+    print(
+        "Payload of %s bytes, default backend: %s"
+        % (len(text), payload_codec.BACKEND)
+    )
+    number = 500
+    for name, dumps, loads in backends:
+        best_dumps = min(
+            timeit.repeat(lambda: dumps(payload), number=number, repeat=5)
+        )
+        best_loads = min(
+            timeit.repeat(lambda: loads(text), number=number, repeat=5)
+        )
+        print(
+            "%-8s dumps %8.3f ms  loads %8.3f ms per payload"
+            % (name, best_dumps / number * 1000, best_loads / number * 1000)
+        )
+
+
+if __name__ == "__main__":
+    main()
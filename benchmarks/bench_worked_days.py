@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+
+
+"""
+Benchmark of the worked days of 50000 payslips, computed payslip by payslip
+as 'get_json_request' did, with 'calendar.monthrange' and the days of
+absence subtracted from the integer field in nested loops, and computed at
+once with the precomputed calendar of 'tools/co_calendar.py', as
+'compute_worked_days'. Some absences have fractional quantities, to check
+that both truncate after every subtraction.
+
+It does not need Odoo, run it with:
+
+    python benchmarks/bench_worked_days.py
+"""
+
+import calendar
+import datetime as dt
+import importlib.machinery
+import importlib.util
+import os
+import random
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_tool(name):
+    # The tools package is not imported, its __init__ needs the server
+    package = importlib.util.module_from_spec(
+        importlib.machinery.ModuleSpec("payroll_tools", None, is_package=True)
+    )
+    package.__path__ = [os.path.join(HERE, os.pardir, "tools")]
+    sys.modules.setdefault("payroll_tools", package)
+    return importlib.import_module("payroll_tools." + name)
+
+
+co_calendar = load_tool("co_calendar")
+
+
+def calculate_time_worked(start, end):
+    # The scalar version of HrPayslip.calculate_time_worked
+    end_day = 30 if end.day == calendar.monthrange(end.year, end.month)[1] else end.day
+    start_day = (
+        30
+        if start.day == calendar.monthrange(start.year, start.month)[1]
+        else start.day
+    )
+    return (
+        (end.year - start.year) * 360
+        + (end.month - start.month) * 30
+        + end_day
+        - start_day
+        + 1
+    )
+
+
+def payslips(count):
+    random.seed(0)
+    result = []
+    for _index in range(count):
+        date_from = dt.date(2024, 1, 1) + dt.timedelta(days=random.randrange(700))
+        if random.random() < 0.5:
+            date_to = date_from + dt.timedelta(days=14)
+        else:
+            date_to = date_from + dt.timedelta(days=29)
+        # Lists of absences by category, as in get_json_request
+        absences = [
+            [{"quantity": random.randint(2, 6) / 2}]
+            if random.random() < 0.1
+            else []
+            for _category in range(6)
+        ]
+        result.append((date_from, date_to, absences))
+    return result
+
+
+def scalar(rows):
+    result = []
+    for date_from, date_to, absences in rows:
+        worked_days = calculate_time_worked(date_from, date_to)
+        for list_with_days in absences:
+            for dict_with_days in list_with_days:
+                # The integer field truncates every subtraction
+                worked_days = int(worked_days - dict_with_days["quantity"])
+        result.append(max(worked_days, 0))
+    return result
+
+
+def many(starts, ends, absences):
+    return co_calendar.worked_days_many(starts, ends, absences)
+
+
+def main():
+    rows = payslips(50000)
+    starts = [row[0] for row in rows]
+    ends = [row[1] for row in rows]
+    # The absence quantities of every payslip, in order, as _get_absences
+    absences = [
+        [item["quantity"] for items in row[2] for item in items] for row in rows
+    ]
+    assert scalar(rows) == many(starts, ends, absences), "Different days"
+    number = 5
+    best_scalar = min(timeit.repeat(lambda: scalar(rows), number=number, repeat=5))
+    best_many = min(
+        timeit.repeat(
+            lambda: many(starts, ends, absences), number=number, repeat=5
+        )
+    )
+    print("%s payslips" % len(rows))
+    print("scalar  %8.2f ms" % (best_scalar / number * 1000))
+    print("indexed %8.2f ms" % (best_many / number * 1000))
+
+
+if __name__ == "__main__":
+    main()
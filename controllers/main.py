@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+
+import os
+
+from odoo import http
+from odoo.exceptions import AccessError, MissingError
+from odoo.http import request, Stream
+
+# Models whose stored DIAN PDF can be downloaded
+EDI_PDF_MODELS = ("hr.payslip", "hr.payslip.edi")
+
+
+class PayrollController(http.Controller):
+    @http.route(
+        "/payroll_dataico/pdf_export/<string:token>", type="http", auth="user"
+    )
+    def pdf_export(self, token, **kwargs):
+        """
+        Downloads the zip file of a PDF export of Edi payslips,
+        streamed from the disk with support for range requests.
+        Only the user that requested the export can download it, while the
+        company of the export is one of its companies.
+        """
+        payslip_edi = request.env["hr.payslip.edi"]
+        payslip_edi.check_access_rights("read")
+        export = (
+            request.env["l10n_co_hr_payroll.pdf_export"]
+            .sudo()
+            .search([("token", "=", token), ("state", "=", "done")], limit=1)
+        )
+        if (
+            not export
+            or export.user_id.id != request.env.uid
+            or export.company_id not in request.env.user.company_ids
+        ):
+            raise request.not_found()
+        path = payslip_edi._get_pdf_export_path(token)
+        if not path:
+            raise request.not_found()
+        stat = os.stat(path)
+        stream = Stream(
+            type="path",
+            path=path,
+            mimetype="application/zip",
+            download_name="edi_payslips.zip",
+            size=stat.st_size,
+            last_modified=stat.st_mtime,
+        )
+        return stream.get_response(as_attachment=True)
+
+    @http.route(
+        "/payroll_dataico/edi_pdf/<string:model>/<int:res_id>",
+        type="http",
+        auth="user",
+    )
+    def edi_pdf(self, model, res_id, download=False, **kwargs):
+        """
+        Serves the PDF stored from the DIAN response of a payslip, streamed
+        from its attachment with support for range requests.
+        """
+        if model not in EDI_PDF_MODELS:
+            raise request.not_found()
+        try:
+            record = request.env["ir.binary"]._find_record(
+                res_model=model, res_id=res_id
+            )
+            filename = (record.number or record.name or str(record.id)).replace(
+                "/", "_"
+            ) + ".pdf"
+            stream = request.env["ir.binary"]._get_stream_from(
+                record,
+                "edi_pdf_base64",
+                filename=filename,
+                mimetype="application/pdf",
+            )
+        except (MissingError, AccessError):
+            raise request.not_found()
+        return stream.get_response(as_attachment=bool(download))
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """
+    The field 'edi_payload_html' is not stored anymore,
+    so its column is dropped from the tables that inherit the Edi mixin.
+    """
+    if not version:
+        return
+    for table in ("l10n_co_hr_payroll_edi", "hr_payslip", "hr_payslip_edi"):
+        _logger.info("Dropping column edi_payload_html from %s", table)
+        cr.execute("ALTER TABLE %s DROP COLUMN IF EXISTS edi_payload_html" % table)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    """
+    The payloads are not evaluated as Python literals anymore when they are
+    rendered, so the legacy payloads stored as the representation of a
+    Python dict are converted to canonical JSON.
+    """
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    for model in ("hr.payslip", "hr.payslip.edi"):
+        env[model]._normalize_edi_payloads()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+from odoo.addons.payroll_dataico.models.hr_contract import PAYROLL_PERIODS
+
+
+def migrate(cr, version):
+    """
+    The field 'payroll_period_id' of the contracts is stored, so its column is
+    created and filled here with a single statement, instead of being
+    computed for every contract when the module is updated.
+    """
+    if not version:
+        return
+    cr.execute(
+        "ALTER TABLE hr_contract ADD COLUMN IF NOT EXISTS payroll_period_id int4"
+    )
+    cases = " ".join(["WHEN %s THEN %s"] * len(PAYROLL_PERIODS))
+    params = [value for item in PAYROLL_PERIODS.items() for value in item]
+    cr.execute(
+        "UPDATE hr_contract SET payroll_period_id = CASE schedule_pay %s END"
+        " WHERE payroll_period_id IS DISTINCT FROM CASE schedule_pay %s END"
+        % (cases, cases),
+        params + params,
+    )
+    _logger.info("Payroll period set in %s contracts", cr.rowcount)
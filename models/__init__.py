@@ -8,6 +8,8 @@ from . import (
     hr_payslip,
     hr_payslip_edi,
     hr_salary_rule,
+    ir_actions_report,
+    pdf_export,
     res_company,
     res_config_settings,
 )
@@ -122,3 +122,62 @@ class DeductionLine(models.Model):
                     _("The deduction amount must always be greater than 0 for: %s")
                     % rec.name
                 )
+
+    @api.model
+    def import_lines(self, vals_list):
+        """
+        Creates deduction lines in bulk, for imports of thousands of lines.
+
+        The lines are validated and their rule fields are set in a single pass
+        over the values, with the rule inputs read at once, and they are
+        inserted with a single `create`, without computing them again line by
+        line. The error messages name every invalid line at once; the
+        constraints still check the created lines, in one pass over them.
+
+        Args:
+            vals_list (list): The values of the lines: 'payslip_id',
+            'rule_input_id', 'amount' and, optionally, 'name' and 'sequence'.
+
+        Raises:
+            ValidationError: With the errors of all the invalid lines,
+            if any line is not valid. No line is created then.
+
+        Returns:
+            recordset: The created deduction lines.
+        """
+        rule_inputs = (
+            self.env["hr.rule.input"]
+            .browse({vals.get("rule_input_id") for vals in vals_list} - {None, False})
+            .exists()
+        )
+        rules = {
+            rule_input.id: (
+                rule_input.name,
+                rule_input.code,
+                rule_input.input_id.deduction_category,
+            )
+            for rule_input in rule_inputs
+        }
+        errors = []
+        lines = []
+        for index, vals in enumerate(vals_list, 1):
+            rule = rules.get(vals.get("rule_input_id"))
+            if not rule:
+                errors.append(_("Line %s: The rule input is not valid") % index)
+                continue
+            rule_name, code, category = rule
+            name = vals.get("name") or rule_name
+            amount = vals.get("amount") or 0.0
+            if amount <= 0:
+                errors.append(
+                    _(
+                        "Line %s: The deduction amount must always be greater than 0 for: %s"
+                    )
+                    % (index, name)
+                )
+            lines.append(
+                dict(vals, name=name, code=code, category=category, amount=amount)
+            )
+        if errors:
+            raise ValidationError("\n".join(errors))
+        return self.create(lines)
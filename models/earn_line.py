@@ -20,8 +20,64 @@
 #
 
 
+import bisect
+import datetime as dt
+import logging
+
 from odoo import fields, models, api, _
-from odoo.exceptions import ValidationError
+from odoo.exceptions import UserError, ValidationError
+
+from ..tools import overtime, time_clock
+
+_logger = logging.getLogger(__name__)
+
+# Number of punches of a time-clock file created at once
+TIME_CLOCK_CHUNK_SIZE = 5000
+
+# Categories with days of absence
+ABSENCE_CATEGORIES = frozenset(
+    [
+        "vacation_common",
+        "licensings_maternity_or_paternity_leaves",
+        "licensings_permit_or_paid_licenses",
+        "licensings_suspension_or_unpaid_leaves",
+        "incapacities_common",
+        "incapacities_professional",
+        "incapacities_working",
+        "legal_strikes",
+    ]
+)
+
+# Categories with hours of overtime
+OVERTIME_CATEGORIES = frozenset(
+    [
+        "daily_overtime",
+        "overtime_night_hours",
+        "hours_night_surcharge",
+        "sunday_holiday_daily_overtime",
+        "daily_surcharge_hours_sundays_holidays",
+        "sunday_night_overtime_holidays",
+        "sunday_holidays_night_surcharge_hours",
+    ]
+)
+
+def compute_quantity(category, date_start, date_end, time_start, time_end):
+    """
+    Returns the quantity of an earn line of the given category:
+    the number of days of the absences, the number of hours of the overtimes
+    and 1 for the rest of the categories.
+    """
+    if category in ABSENCE_CATEGORIES:
+        # The number of days between date_start and date_end
+        if date_end and date_start:
+            return (date_end - date_start).days + 1
+        return 0
+    if category in OVERTIME_CATEGORIES:
+        # The sum of days multiplied by 24 and hours of overtime
+        if date_end and date_start and (time_end or time_start):
+            return 24 * (date_end - date_start).days + time_end - time_start
+        return 0
+    return 1
 
 
 class EarnLine(models.Model):
@@ -179,43 +235,9 @@ class EarnLine(models.Model):
             self (models.Model): The current recordset.
         """
         for rec in self:
-            # Categories with days of absence
-            if rec.category in (
-                "vacation_common",
-                "licensings_maternity_or_paternity_leaves",
-                "licensings_permit_or_paid_licenses",
-                "licensings_suspension_or_unpaid_leaves",
-                "incapacities_common",
-                "incapacities_professional",
-                "incapacities_working",
-                "legal_strikes",
-            ):
-                # Calculate quantity as the number of days between date_start and date_end
-                if rec.date_end and rec.date_start:
-                    rec.quantity = (rec.date_end - rec.date_start).days + 1
-                else:
-                    rec.quantity = 0
-
-            # Categories with hours of overtime
-            elif rec.category in (
-                "daily_overtime",
-                "overtime_night_hours",
-                "hours_night_surcharge",
-                "sunday_holiday_daily_overtime",
-                "daily_surcharge_hours_sundays_holidays",
-                "sunday_night_overtime_holidays",
-                "sunday_holidays_night_surcharge_hours",
-            ):
-                # Calculate quantity as the sum of days multiplied by 24 and hours of overtime
-                if rec.date_end and rec.date_start and rec.time_end and rec.time_start:
-                    days = (rec.date_end - rec.date_start).days
-                    rec.quantity = 24 * days + rec.time_end - rec.time_start
-                else:
-                    rec.quantity = 0
-
-            # Default quantity is 1
-            else:
-                rec.quantity = 1
+            rec.quantity = compute_quantity(
+                rec.category, rec.date_start, rec.date_end, rec.time_start, rec.time_end
+            )
 
     @api.constrains("time_start")
     def _check_time_start(self):
@@ -264,7 +286,7 @@ class EarnLine(models.Model):
         # Iterate over each record in the self object
         for rec in self:
             # Check if the end date is less than the start date
-            if rec.date_end < rec.date_start:
+            if rec.date_start and rec.date_end and rec.date_end < rec.date_start:
                 # Raise a ValidationError with a formatted message
                 raise ValidationError(
                     _("The end date must always be greater than the start date for: %s")
@@ -291,3 +313,324 @@ class EarnLine(models.Model):
                     _("The earn amount must always be greater than 0 for: %s")
                     % rec.name
                 )
+
+    @api.model
+    def import_lines(self, vals_list):
+        """
+        Creates earn lines in bulk, for imports of thousands of lines.
+
+        The lines are validated and their rule fields, quantity and total are
+        computed in a single pass over the values, with the rule inputs read
+        at once, and they are inserted with a single `create`, without
+        computing them again line by line. The error messages name every
+        invalid line at once; the constraints still check the created lines,
+        in one pass over them.
+
+        Args:
+            vals_list (list): The values of the lines: 'payslip_id',
+            'rule_input_id', 'amount' and, optionally, 'name', 'sequence',
+            'date_start', 'date_end', 'time_start' and 'time_end'.
+
+        Raises:
+            ValidationError: With the errors of all the invalid lines,
+            if any line is not valid. No line is created then.
+
+        Returns:
+            recordset: The created earn lines.
+        """
+        rule_inputs = (
+            self.env["hr.rule.input"]
+            .browse({vals.get("rule_input_id") for vals in vals_list} - {None, False})
+            .exists()
+        )
+        rules = {
+            rule_input.id: (
+                rule_input.name,
+                rule_input.code,
+                rule_input.input_id.earn_category,
+            )
+            for rule_input in rule_inputs
+        }
+        errors = []
+        lines = []
+        for index, vals in enumerate(vals_list, 1):
+            rule = rules.get(vals.get("rule_input_id"))
+            if not rule:
+                errors.append(_("Line %s: The rule input is not valid") % index)
+                continue
+            rule_name, code, category = rule
+            name = vals.get("name") or rule_name
+            date_start = fields.Date.to_date(vals.get("date_start"))
+            date_end = fields.Date.to_date(vals.get("date_end"))
+            time_start = vals.get("time_start") or 0.0
+            time_end = vals.get("time_end") or 0.0
+            amount = vals.get("amount") or 0.0
+            if time_start < 0 or time_start >= 24:
+                errors.append(
+                    _("Line %s: Invalid start time: %s") % (index, time_start)
+                )
+            if time_end < 0 or time_end >= 24:
+                errors.append(_("Line %s: Invalid end time: %s") % (index, time_end))
+            if date_start and date_end and date_end < date_start:
+                errors.append(
+                    _(
+                        "Line %s: The end date must always be greater than the start date for: %s"
+                    )
+                    % (index, name)
+                )
+            if amount <= 0:
+                errors.append(
+                    _("Line %s: The earn amount must always be greater than 0 for: %s")
+                    % (index, name)
+                )
+            quantity = compute_quantity(
+                category, date_start, date_end, time_start, time_end
+            )
+            lines.append(
+                dict(
+                    vals,
+                    name=name,
+                    code=code,
+                    category=category,
+                    date_start=date_start,
+                    date_end=date_end,
+                    time_start=time_start,
+                    time_end=time_end,
+                    amount=amount,
+                    quantity=quantity,
+                    total=quantity * amount,
+                )
+            )
+        if errors:
+            raise ValidationError("\n".join(errors))
+        return self.create(lines)
+
+    @api.model
+    def _get_time_clock_lookups(self):
+        """
+        Returns the dictionaries used to resolve the punches of a time-clock
+        file, read once before the file.
+
+        Returns:
+            tuple: The draft payslips of every employee, by identification
+            number, as sorted lists of (date_from, date_to, payslip id), and
+            the ids of the earn rule inputs by code.
+        """
+        payslips = {}
+        for payslip in self.env["hr.payslip"].search_read(
+            [("state", "=", "draft")],
+            ["employee_id", "date_from", "date_to"],
+            order="date_from",
+        ):
+            payslips.setdefault(payslip["employee_id"][0], []).append(
+                (payslip["date_from"], payslip["date_to"], payslip["id"])
+            )
+        employees = self.env["hr.employee"].search_read(
+            [("id", "in", list(payslips)), ("identification_id", "!=", False)],
+            ["identification_id"],
+        )
+        payslips_by_identification = {
+            employee["identification_id"]: payslips[employee["id"]]
+            for employee in employees
+        }
+        rule_inputs = {
+            rule_input["code"]: rule_input["id"]
+            for rule_input in self.env["hr.rule.input"].search_read(
+                [("input_id.type_concept", "=", "earn")], ["code"]
+            )
+        }
+        return payslips_by_identification, rule_inputs
+
+    @api.model
+    def import_time_clock(
+        self, file, file_format="csv", chunk_size=TIME_CLOCK_CHUNK_SIZE
+    ):
+        """
+        Imports the punches of a time-clock export as earn lines.
+
+        Every punch has the 'employee' identification number, the 'code' of
+        the earn rule input, its 'start' and 'end' date and time, and its
+        'amount'. It is added to the draft payslip of the employee whose
+        period includes the start date.
+
+        The file is read lazily and the lines are created in chunks with
+        `import_lines`, with the payslips and the rule inputs resolved by
+        dictionaries read before the file, so the memory does not grow with
+        the size of the file.
+
+        Args:
+            file: A text file object.
+            file_format (str): 'csv' or 'jsonl'.
+            chunk_size (int): The number of lines created at once.
+
+        Raises:
+            UserError: If a punch can't be resolved. No line is created then.
+
+        Returns:
+            int: The number of created earn lines.
+        """
+        payslips, rule_inputs = self._get_time_clock_lookups()
+
+        def prepare(item):
+            number, punch = item
+            try:
+                start = time_clock.parse_datetime(punch["start"])
+                end = time_clock.parse_datetime(punch["end"])
+                amount = float(punch["amount"])
+            except (KeyError, TypeError, ValueError) as e:
+                raise UserError(_("Line %s: Invalid punch: %s") % (number, e))
+            rule_input_id = rule_inputs.get(punch.get("code"))
+            if not rule_input_id:
+                raise UserError(
+                    _("Line %s: There is no earn rule input with the code %s")
+                    % (number, punch.get("code"))
+                )
+            periods = payslips.get(punch.get("employee"), [])
+            date_start = start.date()
+            # The last payslip that starts on or before the punch
+            index = bisect.bisect_right(
+                periods, (date_start, dt.date.max, float("inf"))
+            )
+            if not index or periods[index - 1][1] < date_start:
+                raise UserError(
+                    _("Line %s: The employee %s has no draft payslip on %s")
+                    % (number, punch.get("employee"), date_start)
+                )
+            return {
+                "payslip_id": periods[index - 1][2],
+                "rule_input_id": rule_input_id,
+                "date_start": date_start,
+                "time_start": time_clock.to_hours(start),
+                "date_end": end.date(),
+                "time_end": time_clock.to_hours(end),
+                "amount": amount,
+            }
+
+        punches = time_clock.read_punches(file, file_format)
+        count = 0
+        for chunk in time_clock.chunked(map(prepare, punches), chunk_size):
+            try:
+                self.import_lines(chunk)
+            except ValidationError as e:
+                raise ValidationError(
+                    _("Punches %s to %s of the file:\n%s")
+                    % (count + 1, count + len(chunk), e)
+                )
+            count += len(chunk)
+            # The created lines are not kept in the cache
+            self.env.flush_all()
+            self.env.invalidate_all()
+            _logger.info("Time-clock import: %s earn lines created", count)
+        return count
+
+    @api.model
+    def _get_overtime_parameters(self):
+        """
+        Returns the night window, the ordinary hours per day and the hours
+        per month used to classify and pay the work intervals, read from the
+        system parameters 'jorels.payroll.night_start',
+        'jorels.payroll.night_end', 'jorels.payroll.daily_hours' and
+        'jorels.payroll.monthly_hours'.
+        """
+        params = self.env["ir.config_parameter"].sudo()
+        defaults = {
+            "jorels.payroll.night_start": overtime.NIGHT_START,
+            "jorels.payroll.night_end": overtime.NIGHT_END,
+            "jorels.payroll.daily_hours": overtime.DAILY_HOURS,
+            "jorels.payroll.monthly_hours": 240.0,
+        }
+        values = []
+        for key, default in defaults.items():
+            try:
+                values.append(float(params.get_param(key, default)))
+            except ValueError as e:
+                raise UserError(
+                    "The system parameter '%s' is misconfigured. Use only numbers"
+                    % key
+                )
+        night_start, night_end, daily_hours, monthly_hours = values
+        if not (0 <= night_start < 24 and 0 <= night_end < 24) or monthly_hours <= 0:
+            raise UserError(
+                "The system parameters of the night hours or the monthly hours are misconfigured"
+            )
+        return night_start, night_end, daily_hours, monthly_hours
+
+    @api.model
+    def import_work_intervals(self, intervals):
+        """
+        Imports work intervals as overtime and surcharge earn lines.
+
+        Every interval is split at midnight, at the night window and at the
+        end of the ordinary hours of the day, and its segments are classified
+        into the overtime and surcharge categories with the Colombian
+        holidays. The adjacent segments of the same category are created as
+        a single line with `import_lines`, paid by the hourly wage of the
+        contract with the percentages of the company. The ordinary daytime
+        hours of working days are not imported.
+
+        Args:
+            intervals (iterable): Tuples (payslip id, start, end) with the
+            datetimes of the worked intervals.
+
+        Raises:
+            UserError: If a payslip has no contract or a category has no earn
+            rule input. No line is created then.
+
+        Returns:
+            recordset: The created earn lines.
+        """
+        night_start, night_end, daily_hours, monthly_hours = (
+            self._get_overtime_parameters()
+        )
+        intervals = sorted(intervals, key=lambda interval: interval[:2])
+        payslips = self.env["hr.payslip"].browse(
+            {payslip_id for payslip_id, _start, _end in intervals}
+        )
+        rates = {}
+        for payslip in payslips:
+            if not payslip.contract_id:
+                raise UserError(
+                    _("The payslip %s has no contract") % payslip.display_name
+                )
+            hourly_wage = payslip.contract_id.wage / monthly_hours
+            company = payslip.company_id
+            rates[payslip.id] = {
+                category: hourly_wage
+                * (
+                    (100.0 + company[category])
+                    if category in overtime.OVERTIME_PAID_CATEGORIES
+                    else company[category]
+                )
+                / 100.0
+                for category in OVERTIME_CATEGORIES
+            }
+        rule_inputs = {}
+        for rule_input in self.env["hr.rule.input"].search(
+            [
+                ("input_id.type_concept", "=", "earn"),
+                ("input_id.earn_category", "in", list(OVERTIME_CATEGORIES)),
+            ],
+            order="id",
+        ):
+            rule_inputs.setdefault(rule_input.input_id.earn_category, rule_input.id)
+
+        lines = []
+        for payslip_id, category, start, end in overtime.classify(
+            intervals, night_start, night_end, daily_hours
+        ):
+            if category not in rule_inputs:
+                raise UserError(
+                    _("There is no earn rule input with the category %s") % category
+                )
+            lines.append(
+                {
+                    "payslip_id": payslip_id,
+                    "rule_input_id": rule_inputs[category],
+                    "date_start": start.date(),
+                    "time_start": time_clock.to_hours(start),
+                    "date_end": end.date(),
+                    "time_end": time_clock.to_hours(end),
+                    "amount": rates[payslip_id][category],
+                }
+            )
+        return self.import_lines(lines)
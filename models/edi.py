@@ -20,17 +20,50 @@
 #
 
 import ast
-import datetime as dt
-import json
+import base64
+import hashlib
 import logging
-from copy import deepcopy
 
 import requests
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
+from odoo.addons.base.models.ir_sequence import _update_nogap
 from odoo.exceptions import UserError
+from odoo.tools.lru import LRU
+
+from ..tools import payload as payload_tools
+from ..tools import payload_codec
+from ..tools import payload_html
 
 _logger = logging.getLogger(__name__)
 
+# Rendered payloads by (database, payload checksum, language, listings version).
+# Only the HTML up to PAYLOAD_HTML_CACHE_MAX_SIZE characters is kept, so the
+# cache holds at most 256 * 128 KiB, 32 MiB, per worker.
+PAYLOAD_HTML_CACHE = LRU(256)
+PAYLOAD_HTML_CACHE_MAX_SIZE = 128 * 1024
+
+# Listings referenced by the code fields of the payloads
+PAYLOAD_CODE_MODELS = {
+    "payroll_period_code": "l10n_co_edi_jorels.payroll_periods",
+    "currency_code": "l10n_co_edi_jorels.type_currencies",
+    "id_code": "l10n_co_edi_jorels.type_document_identifications",
+    "municipality_code": "l10n_co_edi_jorels.municipalities",
+    "type_worker_code": "l10n_co_edi_jorels.type_workers",
+    "subtype_worker_code": "l10n_co_edi_jorels.subtype_workers",
+    "country_code": "l10n_co_edi_jorels.countries",
+    "contract_code": "l10n_co_edi_jorels.type_contracts",
+    "_payment_code": "l10n_co_edi_jorels.payment_forms",
+    "_payment_method_code": "l10n_co_edi_jorels.payment_methods",
+    "time_code": "l10n_co_edi_jorels.type_times",
+    "incapacity_code": "l10n_co_edi_jorels.type_incapacities",
+}
+
+# PDF reports of the models that inherit the Edi mixin
+EDI_PDF_REPORTS = {
+    "hr.payslip": "payroll_dataico.action_hr_payslip_co_report",
+    "hr.payslip.edi": "payroll_dataico.action_hr_payslip_edi_co_report",
+}
+
 
 class Edi(models.Model):
     _name = "l10n_co_hr_payroll.edi"
@@ -121,6 +154,10 @@ class Edi(models.Model):
     edi_qr_code = fields.Char(string="QR code", copy=False, readonly=True)
     edi_qr_data = fields.Text(string="QR data", copy=False, readonly=True)
     edi_qr_link = fields.Char(string="QR link", copy=False, readonly=True)
+    # Generated once from the QR data when the response is written
+    edi_qr_image = fields.Binary(
+        string="QR image", attachment=True, copy=False, readonly=True
+    )
     edi_pdf_download_link = fields.Char(string="PDF link", copy=False, readonly=True)
     edi_xml_base64 = fields.Binary(string="XML", copy=False, readonly=True)
     edi_application_response_base64 = fields.Binary(
@@ -147,10 +184,15 @@ class Edi(models.Model):
         states={"draft": [("readonly", False)]},
         default=lambda self: self._default_edi_type_environment(),
     )
+    # Stored in compact canonical JSON, optionally compressed
     edi_payload = fields.Text("Payload", copy=False, readonly=True)
 
+    # It is rendered when the form or the report is read, not stored
     edi_payload_html = fields.Html(
-        "Html payload", copy=False, compute="_compute_edi_payload_html", store=True
+        "Html payload", copy=False, compute="_compute_edi_payload_html"
+    )
+    edi_payload_display = fields.Text(
+        "Payload (JSON)", copy=False, compute="_compute_edi_payload_display"
     )
 
     def _default_edi_type_environment(self):
@@ -207,21 +249,30 @@ class Edi(models.Model):
 
     def dian_pdf_view(self):
         """
-        Generate a URL to download the PDF version of the document from the DIAN
-        (Dirección de Impuestos y Aduanas Nacionales) website. 🪙
+        Opens the PDF version of the document. 🪙
 
-        The DIAN is the Colombian government agency responsible for managing
-        taxes and customs. This method constructs a URL that allows
-        the user to download the PDF version of the document from the DIAN website
-        using the document's unique identifier (edi_uuid).
+        The PDF returned by the provider when the document was validated is
+        stored in the 'edi_pdf_base64' field, so it is served as it is, streamed
+        by the controller of the module. Only the records without a stored PDF
+        are rendered with the PDF report of the model. Without a report, the
+        URL to download the PDF from the DIAN website is returned, built with
+        the document's unique identifier (edi_uuid).
 
         Returns:
             dict: A dictionary containing the action type ('ir.actions.act_url'),
-            target ('new'), and the constructed URL.
-                The URL is formed by appending the document's edi_uuid to a base URL
-                provided by the DIAN for downloading the PDF version of the document.
+            target ('new'), and the constructed URL, or the report action.
         """
         for rec in self:
+            # Only the size is read, not the content of the PDF
+            if rec.with_context(bin_size=True).edi_pdf_base64:
+                return {
+                    "type": "ir.actions.act_url",
+                    "target": "new",
+                    "url": "/payroll_dataico/edi_pdf/%s/%s" % (rec._name, rec.id),
+                }
+            report = rec._get_edi_pdf_report()
+            if report:
+                return report.report_action(rec)
             # Iterate over the records (self is likely a recordset)
             if rec.edi_uuid:
                 # Check if the record has a valid edi_uuid
@@ -232,36 +283,321 @@ class Edi(models.Model):
                     + rec.edi_uuid,  # Construct the URL with the document's edi_uuid
                 }
 
+    @api.model
+    def _get_edi_pdf_report(self):
+        """
+        Returns the PDF report of the model, or an empty recordset if it has none.
+        """
+        xmlid = EDI_PDF_REPORTS.get(self._name)
+        report = xmlid and self.env.ref(xmlid, raise_if_not_found=False)
+        return report or self.env["ir.actions.report"]
+
+    def _get_stored_edi_pdf_ids(self):
+        """
+        Returns the ids of the records of the recordset with a stored PDF,
+        without reading the PDFs from their attachments.
+        """
+        if not self.ids:
+            return set()
+        self.flush_model(["edi_pdf_base64"])
+        self.env.cr.execute(
+            """
+            SELECT res_id FROM ir_attachment
+            WHERE res_model = %s AND res_field = %s AND res_id IN %s
+            """,
+            (self._name, "edi_pdf_base64", tuple(self.ids)),
+        )
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def _next_sequence_numbers(self, sequence_code, count):
+        """
+        Reserves a block of numbers of the sequence with the given code,
+        with a single call to the sequence.
+
+        It works like `ir.sequence.next_by_code`, but instead of locking the
+        sequence once per number, the 'No gap' sequences are increased once
+        by the whole block and the 'Standard' sequences get all the numbers
+        with a single query.
+
+        Args:
+            sequence_code (str): The code of the sequence.
+            count (int): The number of numbers to reserve.
+
+        Returns:
+            list: The formatted numbers, in order. If the sequence does not
+            exist, a list of False values is returned, like `next_by_code`.
+        """
+        if count <= 0:
+            return []
+        sequence_env = self.env["ir.sequence"]
+        sequence_env.check_access_rights("read")
+        sequence = sequence_env.search(
+            [
+                ("code", "=", sequence_code),
+                ("company_id", "in", [self.env.company.id, False]),
+            ],
+            order="company_id",
+            limit=1,
+        )
+        if not sequence:
+            _logger.debug(
+                "No ir.sequence has been found for code '%s'.", sequence_code
+            )
+            return [False] * count
+        # Date range sequences are increased in the range of the current date
+        seq_date = None
+        if sequence.use_date_range:
+            date = self.env.context.get("ir_sequence_date", fields.Date.today())
+            seq_date = self.env["ir.sequence.date_range"].search(
+                [
+                    ("sequence_id", "=", sequence.id),
+                    ("date_from", "<=", date),
+                    ("date_to", ">=", date),
+                ],
+                limit=1,
+            )
+            if not seq_date:
+                seq_date = sequence._create_date_range_seq(date)
+            sequence = sequence.with_context(
+                ir_sequence_date_range=seq_date.date_from
+            )
+        if sequence.implementation == "standard":
+            if seq_date:
+                seq_name = "ir_sequence_%03d_%03d" % (sequence.id, seq_date.id)
+            else:
+                seq_name = "ir_sequence_%03d" % sequence.id
+            self.env.cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)", [seq_name, count]
+            )
+            numbers = [row[0] for row in self.env.cr.fetchall()]
+        else:
+            increment = sequence.number_increment
+            number_next = _update_nogap(seq_date or sequence, increment * count)
+            numbers = [number_next + index * increment for index in range(count)]
+        return [sequence.get_next_char(number) for number in numbers]
+
+    def _assign_sequence_numbers(self, sequence_code):
+        """
+        Assigns consecutive numbers of the sequence with the given code to the
+        records, in the order of the recordset, reserving them as a block.
+
+        Args:
+            sequence_code (str): The code of the sequence.
+
+        Raises:
+            UserError: If there are records to number and the sequence
+                does not exist.
+        """
+        numbers = self._next_sequence_numbers(sequence_code, len(self))
+        if self and not all(numbers):
+            raise UserError(
+                _("You must create a sequence with code '%s'") % sequence_code
+            )
+        for rec, number in zip(self, numbers):
+            rec.number = number
+
+    def _copy_multi(self, defaults):
+        """
+        Duplicates the records with a single call to `create`.
+
+        It works like calling `copy` on every record, but the values of all
+        the copies are prepared first and then created as a batch.
+
+        Args:
+            defaults (list): The default values of the copy of every record,
+                in the order of the recordset.
+
+        Returns:
+            RecordSet: The new records, in the order of the recordset.
+        """
+        vals_list = [
+            rec.with_context(active_test=False).copy_data(default)[0]
+            for rec, default in zip(self, defaults)
+        ]
+        copies = self.create(vals_list)
+        for rec, copy, default in zip(self, copies, defaults):
+            rec.with_context(from_copy_translation=True).copy_translations(
+                copy, excluded=default or ()
+            )
+        return copies
+
     @api.depends("edi_payload")
     def _compute_edi_payload_html(self):
         """
         Compute the HTML representation of the `edi_payload` field.
 
-        This method is decorated with `@api.depends("edi_payload")` 
-        to indicate that it depends on the `edi_payload` field.  
-        It iterates over each record in `self` and checks if 
-        the `edi_payload` field is not empty. If it is not empty, 
-        it tries to parse the `edi_payload` as JSON using `json.loads()` 
-        and converts it to HTML using the `payload2html()` method. If 
-        the parsing fails with a `JSONDecodeError`, it tries to evaluate 
-        the `edi_payload` using `ast.literal_eval()` and converts it to HTML.
-        If the `edi_payload` is empty, it sets `edi_payload_html` to an empty string.
+        The field is not stored, so it is only rendered when it is read.
+        The rendered HTML is kept in a process-wide cache keyed by the database,
+        the checksum of the payload, the language and the version of the
+        listings, so opening the same payslips again does not render them
+        again. The cache is bounded by the number of entries and the size of
+        each one, the largest payloads are always rendered.
+
+        The stored payloads are always JSON, the legacy ones are converted by
+        `_normalize_edi_payloads`. If the `edi_payload` is empty or is not
+        valid JSON, it sets `edi_payload_html` to an empty string.
 
         Parameters:
             self (RecordSet): The recordset containing the records to compute.
         """
+        lang = self.env.lang or "en_US"
+        version = self._get_payload_code_names(lang)["version"]
         for rec in self:
-            if rec.edi_payload:
-                try:
-                    rec.edi_payload_html = rec.payload2html(
-                        json.loads(rec.edi_payload), 2
-                    )
-                except json.decoder.JSONDecodeError as e:
-                    rec.edi_payload_html = rec.payload2html(
-                        ast.literal_eval(rec.edi_payload), 2
-                    )
-            else:
+            if not rec.edi_payload:
                 rec.edi_payload_html = ""
+                continue
+            key = (
+                self.env.cr.dbname,
+                hashlib.sha1(rec.edi_payload.encode()).hexdigest(),
+                lang,
+                version,
+            )
+            html = PAYLOAD_HTML_CACHE.get(key)
+            if html is None:
+                try:
+                    payload = rec._decode_edi_payload()
+                except ValueError as e:
+                    _logger.warning("The payload of %s is not valid JSON: %s", rec, e)
+                    rec.edi_payload_html = ""
+                    continue
+                html = rec.payload2html(payload, 2)
+                if len(html) <= PAYLOAD_HTML_CACHE_MAX_SIZE:
+                    PAYLOAD_HTML_CACHE[key] = html
+            rec.edi_payload_html = html
+
+    @api.depends("edi_payload")
+    def _compute_edi_payload_display(self):
+        """
+        Compute the `edi_payload` field pretty-printed, as it is only stored
+        in its compact form.
+        If the `edi_payload` is not valid JSON, it is shown as it is stored.
+        """
+        for rec in self:
+            if not rec.edi_payload:
+                rec.edi_payload_display = ""
+                continue
+            try:
+                rec.edi_payload_display = payload_codec.dumps_pretty(
+                    rec._decode_edi_payload()
+                )
+            except ValueError as e:
+                rec.edi_payload_display = rec.edi_payload
+
+    def _get_edi_payload_compress(self):
+        """
+        Returns True if the payloads are stored compressed, read from the
+        system parameter 'jorels.payroll.edi_payload_compress'.
+        """
+        try:
+            return bool(
+                int(
+                    self.env["ir.config_parameter"]
+                    .sudo()
+                    .get_param("jorels.payroll.edi_payload_compress", 0)
+                )
+            )
+        except ValueError as e:
+            raise UserError(
+                "The system parameter 'jorels.payroll.edi_payload_compress' is misconfigured. Use only 0 or 1"
+            )
+
+    @api.model
+    def _encode_edi_payload(self, payload):
+        """
+        Returns the value stored in the 'edi_payload' field for a payload:
+        compact canonical JSON, compressed if it is configured.
+
+        Args:
+            payload (dict or str): The payload, or its text already
+            serialized with `payload_codec.dumps`.
+
+        Returns:
+            str: The value to store.
+        """
+        if not isinstance(payload, str):
+            payload = payload_codec.dumps(payload)
+        return payload_codec.store_text(payload, self._get_edi_payload_compress())
+
+    @api.model
+    def _normalize_edi_payloads(self, batch_size=1000):
+        """
+        Rewrites the payloads stored in the table of the model that are not in
+        their canonical form, reading and writing them in batches of ids.
+
+        The legacy payloads stored as the representation of a Python dict are
+        evaluated as literals, only here, so they are never parsed as Python
+        when they are read. The payloads that can't be converted are left as
+        they are.
+
+        Args:
+            batch_size (int): The number of rows read per query.
+
+        Returns:
+            tuple: The number of converted payloads and the number of
+            payloads that could not be converted.
+        """
+        compress = self._get_edi_payload_compress()
+        cr = self.env.cr
+        converted = invalid = 0
+        last_id = 0
+        while True:
+            cr.execute(
+                "SELECT id, edi_payload FROM %s"
+                " WHERE id > %%s AND edi_payload IS NOT NULL"
+                " ORDER BY id LIMIT %%s" % self._table,
+                (last_id, batch_size),
+            )
+            rows = cr.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            values = []
+            for record_id, stored in rows:
+                normalized = payload_codec.normalize_stored(stored, compress)
+                if normalized is None:
+                    try:
+                        payload = ast.literal_eval(stored)
+                    except (
+                        ValueError,
+                        TypeError,
+                        SyntaxError,
+                        MemoryError,
+                        RecursionError,
+                    ):
+                        payload = None
+                    if not isinstance(payload, dict):
+                        invalid += 1
+                        continue
+                    normalized = payload_codec.encode_stored(payload, compress)
+                if normalized != stored:
+                    values.append((normalized, record_id))
+            if values:
+                cr.executemany(
+                    "UPDATE %s SET edi_payload = %%s WHERE id = %%s" % self._table,
+                    values,
+                )
+                converted += len(values)
+        if converted:
+            self.invalidate_model(["edi_payload"])
+        _logger.info(
+            "Payloads of %s: %s converted, %s could not be converted",
+            self._name,
+            converted,
+            invalid,
+        )
+        return converted, invalid
+
+    def _decode_edi_payload(self):
+        """
+        Returns the payload stored in the 'edi_payload' field of the record,
+        whether it is compressed or not.
+
+        Raises:
+            ValueError: If the stored payload is not valid JSON.
+        """
+        self.ensure_one()
+        return payload_codec.loads_stored(self.edi_payload)
 
     @api.model
     def join_dicts(self, a, b, date_issue):
@@ -282,113 +618,7 @@ class Edi(models.Model):
         Returns:
             dict: The merged dictionary containing the combined payroll information.
         """
-        # Determine the order of the dictionaries based on the 'settlement_start_date' key
-        if dt.datetime.strptime(
-            a["period"]["settlement_start_date"], "%Y-%m-%d"
-        ) < dt.datetime.strptime(b["period"]["settlement_start_date"], "%Y-%m-%d"):
-            first, last = deepcopy(a), deepcopy(b)
-        else:
-            first, last = deepcopy(b), deepcopy(a)
-        # Root level keys
-        self.dict_root_sum(first, last, ["accrued_total", "deductions_total", "total"])
-        self.dict_root_append_lists(first, last, ["notes", "payment_dates"])
-        # Sequence key
-        if "sequence" in last:
-            last.pop("sequence")
-        # Period key
-        self.dict_root_merge(
-            first["period"], last["period"], ["admission_date", "settlement_start_date"]
-        )
-        last["period"]["date_issue"] = date_issue
-        # Earn key
-        self.dict_root_sum(
-            first["earn"],
-            last["earn"],
-            [
-                "endowment",
-                "sustainment_support",
-                "telecommuting",
-                "company_withdrawal_bonus",
-                "compensation",
-                "refund",
-            ],
-        )
-        self.dict_sum_2(first, last, "earn", "basic", ["worked_days", "worker_salary"])
-        self.dict_sum_2(
-            first, last, "earn", "primas", ["quantity", "payment", "non_salary_payment"]
-        )
-        self.dict_sum_2(
-            first,
-            last,
-            "earn",
-            "layoffs",
-            ["payment", "interest_payment"],
-            ["percentage"],
-        )
-        self.dict_root_append_dicts(
-            first["earn"], last["earn"], ["vacation", "licensings"]
-        )
-        self.dict_root_append_lists(
-            first["earn"],
-            last["earn"],
-            [
-                "transports",
-                "overtimes_surcharges",
-                "incapacities",
-                "bonuses",
-                "assistances",
-                "legal_strikes",
-                "other_concepts",
-                "compensations",
-                "vouchers",
-                "commissions",
-                "third_party_payments",
-                "advances",
-            ],
-        )
-        # Deduction key
-        self.dict_sum_1(
-            first,
-            last,
-            "deduction",
-            [
-                "voluntary_pension",
-                "withholding_source",
-                "afc",
-                "cooperative",
-                "tax_lien",
-                "complementary_plans",
-                "education",
-                "refund",
-                "debt",
-            ],
-        )
-        self.dict_sum_2(first, last, "deduction", "health", ["payment"], ["percentage"])
-        self.dict_sum_2(
-            first, last, "deduction", "pension_fund", ["payment"], ["percentage"]
-        )
-        self.dict_sum_2(
-            first,
-            last,
-            "deduction",
-            "pension_security_fund",
-            ["payment", "payment_subsistence"],
-            ["percentage", "percentage_subsistence"],
-        )
-        self.dict_append_lists_1(
-            first,
-            last,
-            "deduction",
-            [
-                "trade_unions",
-                "sanctions",
-                "libranzas",
-                "third_party_payments",
-                "advances",
-                "other_deductions",
-            ],
-        )
-        return last
+        return payload_tools.join_dicts(a, b, date_issue)
 
     def write_response(self, response, payload):
         """
@@ -404,8 +634,12 @@ class Edi(models.Model):
 
         Args:
             response (dict): A dictionary containing the response data received from the DIAN.
-            payload (dict): The original payload sent to the DIAN.
+            payload (dict or str): The original payload sent to the DIAN,
+            or its stored form.
         """
+        if isinstance(payload, dict):
+            payload = self._encode_edi_payload(payload)
+        qr_image = self._generate_edi_qr_image(response["qr_data"])
         for rec in self:
             # Update the fields with the corresponding values from the response dictionary
             rec.edi_is_valid = response["is_valid"]
@@ -427,6 +661,7 @@ class Edi(models.Model):
             rec.edi_signature = response["signature"]
             rec.edi_qr_code = response["qr_code"]
             rec.edi_qr_data = response["qr_data"]
+            rec.edi_qr_image = qr_image
             rec.edi_qr_link = response["qr_link"]
             rec.edi_pdf_download_link = response["pdf_download_link"]
             rec.edi_xml_base64 = response["xml_base64_bytes"]
@@ -441,6 +676,30 @@ class Edi(models.Model):
             rec.edi_type_environment = response["type_environment_id"]
             rec.edi_payload = payload
 
+    @api.model
+    def _generate_edi_qr_image(self, qr_data):
+        """
+        Generates the QR image printed in the reports, so it is not generated
+        again every time a payslip is printed.
+
+        Args:
+            qr_data (str): The QR data of the DIAN response.
+
+        Returns:
+            bytes: The PNG image encoded in base64, or False if there is no
+            QR data or the image can't be generated.
+        """
+        if not qr_data:
+            return False
+        try:
+            image = self.env["ir.actions.report"].barcode(
+                "QR", qr_data, width=192, height=192
+            )
+        except (ValueError, AttributeError) as e:
+            _logger.debug("The QR image could not be generated: %s", e)
+            return False
+        return base64.b64encode(image)
+
     @api.model
     def get_json_delete_request(self, requests_data):
         """
@@ -490,6 +749,7 @@ class Edi(models.Model):
             UserError: If certain required fields are missing or if validation fails.
         """
         for rec in self:
+            settings = rec.company_id._get_payroll_settings()
             try:
                 if "sequence" not in requests_data:
                     raise UserError(_("The sequence is required."))
@@ -503,28 +763,31 @@ class Edi(models.Model):
                         raise UserError(_("The reference payroll is not valid."))
                 else:
                     type_edi_document = "payroll"
-                # Payload
-                payload = json.dumps(requests_data, indent=2, sort_keys=False)
+                # Payload, serialized once. The same text is stored and sent,
+                # the environment is only added to the request body.
+                body = payload_codec.dumps(requests_data)
+                payload = rec._encode_edi_payload(body)
                 # Software id and pin
-                if rec.company_id.edi_payroll_id and rec.company_id.edi_payroll_pin:
-                    requests_data["environment"] = {
-                        "software": rec.company_id.edi_payroll_id,
-                        "pin": rec.company_id.edi_payroll_pin,
-                    }
+                if settings.edi_payroll_id and settings.edi_payroll_pin:
+                    body = payload_codec.add_members(
+                        body,
+                        {
+                            "environment": {
+                                "software": settings.edi_payroll_id,
+                                "pin": settings.edi_payroll_pin,
+                            }
+                        },
+                    )
                 else:
                     raise UserError(
                         _("You do not have a software id and pin configured")
                     )
                 # API key and URL
-                if rec.company_id.api_key:
-                    token = rec.company_id.api_key
+                if settings.api_key:
+                    token = settings.api_key
                 else:
                     raise UserError(_("You must configure a token"))
-                api_url = (
-                    self.env["ir.config_parameter"]
-                    .sudo()
-                    .get_param("jorels.edipo.api_url", "https://edipo.jorels.com")
-                )
+                api_url = settings.api_url
                 params = {"token": token}
                 header = {
                     "accept": "application/json",
@@ -532,20 +795,19 @@ class Edi(models.Model):
                 }
                 # Request
                 api_url = api_url + "/" + type_edi_document
-                rec.edi_is_not_test = rec.company_id.edi_payroll_is_not_test
+                rec.edi_is_not_test = settings.edi_payroll_is_not_test
                 if not rec.edi_is_not_test:
-                    if rec.company_id.edi_payroll_test_set_id:
-                        params["test_set_id"] = rec.company_id.edi_payroll_test_set_id
+                    if settings.edi_payroll_test_set_id:
+                        params["test_set_id"] = settings.edi_payroll_test_set_id
                     else:
                         raise UserError(_("You have not configured a 'TestSetId'."))
                 _logger.debug("API URL: %s", api_url)
-                _logger.debug(
-                    "DIAN Validation Request: %s",
-                    json.dumps(requests_data, indent=2, sort_keys=False),
+                _logger.debug("DIAN Validation Request: %s", body)
+                response = payload_codec.loads(
+                    requests.post(
+                        api_url, body.encode("utf-8"), headers=header, params=params
+                    ).content
                 )
-                response = requests.post(
-                    api_url, json.dumps(requests_data), headers=header, params=params
-                ).json()
                 _logger.debug("API Response: %s", response)
                 if "detail" in response:
                     raise UserError(response["detail"])
@@ -592,7 +854,7 @@ class Edi(models.Model):
                     raise UserError(_("No logical response was obtained from the API."))
             except Exception as e:
                 _logger.debug("Failed to process the request: %s", e)
-                if not rec.company_id.edi_payroll_always_validate:
+                if not settings.edi_payroll_always_validate:
                     raise UserError(_("Failed to process the request: %s") % e)
                 else:
                     rec.message_post(
@@ -623,18 +885,15 @@ class Edi(models.Model):
                     _logger.debug("API Requests: %s", requests_data)
 
                     # Get API key and URL
-                    if rec.company_id.api_key:
-                        token = rec.company_id.api_key
+                    settings = rec.company_id._get_payroll_settings()
+                    if settings.api_key:
+                        token = settings.api_key
                     else:
                         raise UserError(_("You must configure a token"))
-                    api_url = (
-                        self.env["ir.config_parameter"]
-                        .sudo()
-                        .get_param("jorels.edipo.api_url", "https://edipo.jorels.com")
-                    )
+                    api_url = settings.api_url
                     # Set environment parameter
                     rec.edi_is_not_test = (
-                        rec.edi_is_not_test or rec.company_id.edi_payroll_is_not_test
+                        rec.edi_is_not_test or settings.edi_payroll_is_not_test
                     )
                     params = {
                         "token": token,
@@ -652,12 +911,14 @@ class Edi(models.Model):
                         api_url = api_url + "/document/" + rec.edi_uuid
                     _logger.debug("API URL: %s", api_url)
                     # Make the API request
-                    response = requests.post(
-                        api_url,
-                        json.dumps(requests_data),
-                        headers=header,
-                        params=params,
-                    ).json()
+                    response = payload_codec.loads(
+                        requests.post(
+                            api_url,
+                            payload_codec.dumps(requests_data).encode("utf-8"),
+                            headers=header,
+                            params=params,
+                        ).content
+                    )
                     _logger.debug("API Response: %s", response)
                     # Process the API response
                     if "detail" in response:
@@ -744,15 +1005,12 @@ class Edi(models.Model):
                     _logger.debug("API Requests: %s", requests_data)
 
                     # Retrieve API key and URL
-                    if rec.company_id.api_key:
-                        token = rec.company_id.api_key
+                    settings = rec.company_id._get_payroll_settings()
+                    if settings.api_key:
+                        token = settings.api_key
                     else:
                         raise UserError(_("You must configure a token"))
-                    api_url = (
-                        self.env["ir.config_parameter"]
-                        .sudo()
-                        .get_param("jorels.edipo.api_url", "https://edipo.jorels.com")
-                    )
+                    api_url = settings.api_url
 
                     # Set parameters for the request
                     params = {"token": token}
@@ -768,12 +1026,14 @@ class Edi(models.Model):
                     _logger.debug("API URL: %s", api_url)
 
                     # Make the API request and get the response
-                    response = requests.post(
-                        api_url,
-                        json.dumps(requests_data),
-                        headers=header,
-                        params=params,
-                    ).json()
+                    response = payload_codec.loads(
+                        requests.post(
+                            api_url,
+                            payload_codec.dumps(requests_data).encode("utf-8"),
+                            headers=header,
+                            params=params,
+                        ).content
+                    )
                     _logger.debug("API Response: %s", response)
 
                     # Handle authentication error
@@ -831,10 +1091,7 @@ class Edi(models.Model):
             last (dict): The dictionary to merge into.
             vals (list): The list of fields to merge.
         """
-        # Merge the values of each field recursively.
-        for field in vals:
-            # Merge the values of a single field.
-            self.dict_root_sum_field(first, last, field)
+        payload_tools.dict_root_sum(first, last, vals)
 
     @api.model
     def dict_root_merge(self, first, last, vals=[]):
@@ -846,17 +1103,7 @@ class Edi(models.Model):
             last (dict): The dictionary to merge into.
             vals (list): The list of fields to merge.
         """
-        # Loop through each field in the 'vals' list and merge its values.
-        for field in vals:
-            """
-            Merge the values of a single field.
-
-            Args:
-                first (dict): The dictionary to merge from.
-                last (dict): The dictionary to merge into.
-                field (str): The field to merge.
-            """
-            self.dict_root_merge_field(first, last, field)
+        payload_tools.dict_root_merge(first, last, vals)
 
     @api.model
     def dict_root_sum_field(self, first, last, field):
@@ -870,14 +1117,7 @@ class Edi(models.Model):
             last (dict): The dictionary to merge into.
             field (str): The field to merge.
         """
-        # Check if the field exists in both dictionaries.
-        if field in first:
-            # If the field does not exist in 'last' dictionary, add it.
-            if field not in last:
-                last[field] = first[field]
-            # Otherwise, just add the value from 'first' to the existing value in 'last'.
-            else:
-                last[field] += first[field]
+        payload_tools.dict_root_sum(first, last, [field])
 
     @api.model
     def dict_root_merge_field(self, first, last, field):
@@ -889,11 +1129,7 @@ class Edi(models.Model):
             last (dict): The dictionary to merge into.
             field (str): The field to merge.
         """
-        # Check if the field exists in both dictionaries.
-        if field in first:
-            # If the field does not exist in 'last' dictionary, add it.
-            # Otherwise, just replace the value with the one from 'first'.
-            last[field] = first[field]
+        payload_tools.dict_root_merge(first, last, [field])
 
     @api.model
     def dict_root_append_lists(self, first, last, list_fields):
@@ -905,17 +1141,7 @@ class Edi(models.Model):
             last (dict): The dictionary to append to.
             list_fields (list): The list of fields to append.
         """
-        # Iterate over each list field in list_fields
-        for list_field in list_fields:
-            # Check if the list field exists in both dictionaries.
-            if list_field in first:
-                # If the list field does not exist in 'last' dictionary, add it.
-                if list_field not in last:
-                    last[list_field] = []
-                # Append each temp_dict from the 'first' dictionary
-                # to the 'last' dictionary's list field.
-                for temp_dict in first[list_field]:
-                    last[list_field].append(temp_dict)
+        payload_tools.dict_root_append_lists(first, last, list_fields)
 
     @api.model
     def dict_root_append_dicts(self, first, last, dict_fields):
@@ -927,18 +1153,7 @@ class Edi(models.Model):
             last (dict): The dictionary to append to.
             dict_fields (list): The list of fields to append.
         """
-        # Iterate over each dictionary field in dict_fields
-        for dict_field in dict_fields:
-            # Check if the dictionary field exists in both dictionaries.
-            if dict_field in first:
-                # If the dictionary field does not exist in 'last' dictionary, add it.
-                if dict_field not in last:
-                    last[dict_field] = {}
-                # Append each key-value pair from the 'first' dictionary
-                # to the 'last' dictionary's dictionary field.
-                self.dict_root_append_lists(
-                    first[dict_field], last[dict_field], first[dict_field]
-                )
+        payload_tools.dict_root_append_dicts(first, last, dict_fields)
 
     # Others
     @api.model
@@ -954,14 +1169,7 @@ class Edi(models.Model):
             b (str): The key to append lists from.
             c (list): The list of fields to append.
         """
-        # Check if the 'b' key exists in both dictionaries.
-        if b in first:
-            # If the 'b' key does not exist in 'last' dictionary, add it.
-            if b not in last:
-                last[b] = {}
-            # Append each temp_dict from the 'b' key in the 'first' dictionary
-            # to the 'b' key in the 'last' dictionary.
-            self.dict_root_append_lists(first[b], last[b], c)
+        payload_tools.dict_append_lists_1(first, last, b, c)
 
     @api.model
     def dict_sum_1(self, first, last, b, c=[], d=[]):
@@ -979,17 +1187,7 @@ class Edi(models.Model):
             c (list): The list of fields to sum.
             d (list): The list of fields to merge.
         """
-        # Check if the 'b' key exists in both dictionaries.
-        if b in first:
-            # If the 'b' key does not exist in 'last' dictionary, add it.
-            if b not in last:
-                last[b] = {}
-            # Append each sum from the 'b' key in the 'first' dictionary
-            # to the 'b' key in the 'last' dictionary.
-            self.dict_root_sum(first[b], last[b], c)
-            # Merge each list from the 'b' key in the 'first' dictionary
-            # to the 'b' key in the 'last' dictionary.
-            self.dict_root_merge(first[b], last[b], d)
+        payload_tools.dict_sum_1(first, last, b, c, d)
 
     @api.model
     def dict_sum_2(self, first, last, a, b, c=[], d=[]):
@@ -1008,22 +1206,7 @@ class Edi(models.Model):
             - c (list): The list of fields to sum.
             - d (list): The list of fields to merge.
         """
-        # Check if the 'a' key exists in both dictionaries.
-        if a in first:
-            # If the 'a' key does not exist in 'last' dictionary, add it.
-            if a not in last:
-                last[a] = {}
-            # Check if the 'b' key exists in the 'a' key in 'first' dictionary.
-            if b in first[a]:
-                # If the 'b' key does not exist in 'a' key in 'last' dictionary, add it.
-                if b not in last[a]:
-                    last[a][b] = {}
-                # Append each sum from the 'b' key in the 'a' key in the 'first' dictionary
-                # to the 'b' key in the 'a' key in the 'last' dictionary.
-                self.dict_root_sum(first[a][b], last[a][b], c)
-                # Merge each list from the 'b' key in the 'a' key in the 'first' dictionary
-                # to the 'b' key in the 'a' key in the 'last' dictionary.
-                self.dict_root_merge(first[a][b], last[a][b], d)
+        payload_tools.dict_sum_2(first, last, a, b, c, d)
 
     @api.model
     def dict_merge_field(self, first, last, a, b, c):
@@ -1067,21 +1250,20 @@ class Edi(models.Model):
                 last[a][b][c] += first[a][b][c]
 
     @api.model
-    def get_json2html_field_name(self, field_name, key):
+    @tools.ormcache("lang")
+    def _get_json2html_field_names(self, lang):
         """
-        Returns the translated field name for a given field or key.
+        Returns the translated names of the payload fields for the given
+        language. The result is cached by language, so it must not be modified.
 
         Args:
-            field_name (str): The name of the field to get the translated name for.
-            key (str): The key to get the translated name for.
+            lang (str): The language of the translations.
 
         Returns:
-            str: The translated field name. If the field_name is found in the field_names dictionary,
-                 it returns the translated value for that field_name. If the key is found in the
-                 field_names dictionary, it returns the translated value for that key. Otherwise,
-                 it returns the original field_name.
+            dict: The translated names by field name or key.
         """
-        field_names = {
+        self = self.with_context(lang=lang)
+        return {
             "_sync": _("Sync"),
             "_rounding": _("Rounding"),
             "_accrued_total": _("Accrued total"),
@@ -1213,6 +1395,23 @@ class Edi(models.Model):
             "_payroll_reference": _("Reference"),
             "issue_date": _("Issue date"),
         }
+
+    @api.model
+    def get_json2html_field_name(self, field_name, key):
+        """
+        Returns the translated field name for a given field or key.
+
+        Args:
+            field_name (str): The name of the field to get the translated name for.
+            key (str): The key to get the translated name for.
+
+        Returns:
+            str: The translated field name. If the field_name is found in the field_names dictionary,
+                 it returns the translated value for that field_name. If the key is found in the
+                 field_names dictionary, it returns the translated value for that key. Otherwise,
+                 it returns the original field_name.
+        """
+        field_names = self._get_json2html_field_names(self.env.lang or "en_US")
         if field_name in field_names:
             return field_names[field_name]
         elif key in field_names:
@@ -1220,104 +1419,62 @@ class Edi(models.Model):
         else:
             return field_name
 
+    @api.model
+    @tools.ormcache("lang")
+    def _get_payload_code_names(self, lang):
+        """
+        Returns the names, in the given language, of all the records of the
+        listings referenced by the code fields of the payloads, taken from the
+        cached catalogues of the listings.
+
+        The result is cached by language until the listings change, so it must
+        not be modified. Its 'version' is a checksum of the names, so it only
+        changes when the names change.
+
+        Returns:
+            dict: The 'version' of the lookup and the 'names' by listing model,
+            as a dictionary of names by id.
+        """
+        names = {
+            model_name: self.env[model_name]
+            .with_context(lang=lang)
+            ._get_catalogue()["names"]
+            for model_name in set(PAYLOAD_CODE_MODELS.values())
+        }
+        version = hashlib.sha1(
+            repr(
+                sorted(
+                    (model_name, sorted(model_names.items()))
+                    for model_name, model_names in names.items()
+                )
+            ).encode()
+        ).hexdigest()
+        return {"version": version, "names": names}
+
     @api.model
     def payload2html(self, payload, tab, title=""):
         """
-        A function that converts a payload dictionary into an HTML table structure for rendering. 
+        A function that converts a payload dictionary into an HTML table structure for rendering.
+
+        The payload is rendered in a single traversal, with the translated field
+        names and the names of the listings taken from the cached lookups,
+        so rendering does not run any query once the lookups are loaded.
+
         Args:
             payload (dict): The payload dictionary to be converted.
             tab (int): The tab level for the HTML structure.
-            title (str, optional): The title to be included in the HTML output. 
+            title (str, optional): The title to be included in the HTML output.
             Defaults to an empty string.
 
         Returns:
             str: The HTML representation of the payload as a table.
         """
-        output = ""
-        output_temp = "<table class='o_group o_inner_group o_group_col_12'><tbody>"
-        for key, value in payload.items():
-            field_name = title + "_" + key
-            if type(value) != dict and type(value) != list:
-                if key == "sync":
-                    continue
-                if key[-4:] == "code":
-                    model_names = {
-                        "payroll_period_code": "l10n_co_edi_jorels.payroll_periods",
-                        "currency_code": "l10n_co_edi_jorels.type_currencies",
-                        "id_code": "l10n_co_edi_jorels.type_document_identifications",
-                        "municipality_code": "l10n_co_edi_jorels.municipalities",
-                        "type_worker_code": "l10n_co_edi_jorels.type_workers",
-                        "subtype_worker_code": "l10n_co_edi_jorels.subtype_workers",
-                        "country_code": "l10n_co_edi_jorels.countries",
-                        "contract_code": "l10n_co_edi_jorels.type_contracts",
-                        "_payment_code": "l10n_co_edi_jorels.payment_forms",
-                        "_payment_method_code": "l10n_co_edi_jorels.payment_methods",
-                        "time_code": "l10n_co_edi_jorels.type_times",
-                        "incapacity_code": "l10n_co_edi_jorels.type_incapacities",
-                    }
-                    try:
-                        if field_name in model_names:
-                            value = (
-                                self.env[model_names[field_name]]
-                                .search([("id", "=", value)])[0]
-                                .name
-                            )
-                        elif key in model_names:
-                            value = (
-                                self.env[model_names[key]]
-                                .search([("id", "=", value)])[0]
-                                .name
-                            )
-                    except IndexError as e:
-                        pass
-                output_temp += (
-                    "<tr><td class='o_td_label' style='width: 50%;'><label class='o_form_label'><strong>"
-                    + self.get_json2html_field_name(field_name, key)
-                    + "</strong></label></td>"
-                    "<td class='text-right' style='width: 100%;'><span class='o_field_char o_field_widget'>"
-                    + str(value)
-                    + "</span></td><td/></tr>"
-                )
-        if output_temp != "<table class='o_group o_inner_group o_group_col_12'><tbody>":
-            output_temp += "</tbody></table><br/><br/>"
-            output += output_temp
-        for key, value in payload.items():
-            field_name = title + "_" + key
-            if type(value) == dict:
-                if key == "environment":
-                    continue
-                output += (
-                    "<h"
-                    + str(tab)
-                    + ">"
-                    + self.get_json2html_field_name(field_name, key)
-                    + "</h"
-                    + str(tab)
-                    + ">"
-                )
-                output += self.payload2html(value, tab + 1, field_name)
-        for key, value in payload.items():
-            field_name = title + "_" + key
-            if type(value) == list:
-                output += (
-                    "<h"
-                    + str(tab)
-                    + ">"
-                    + self.get_json2html_field_name(field_name, key)
-                    + "</h"
-                    + str(tab)
-                    + ">"
-                )
-                for i, valor in enumerate(value):
-                    output += (
-                        "<h"
-                        + str(tab + 1)
-                        + ">"
-                        + str(i + 1)
-                        + ". "
-                        + "</h"
-                        + str(tab + 1)
-                        + ">"
-                    )
-                    output += self.payload2html(valor, tab + 1, field_name)
-        return output
+        lang = self.env.lang or "en_US"
+        return payload_html.render_payload_html(
+            payload,
+            tab,
+            title,
+            field_names=self._get_json2html_field_names(lang),
+            code_models=PAYLOAD_CODE_MODELS,
+            code_names=self._get_payload_code_names(lang)["names"],
+        )
@@ -21,7 +21,7 @@
 
 import logging
 
-from odoo import fields, models, api
+from odoo import fields, models
 
 _logger = logging.getLogger(__name__)
 
@@ -54,19 +54,61 @@ class EdiGen(models.TransientModel):
         required=True,
         default=lambda self: fields.Date.context_today(self).year,
     )
-    # It only works for one contract per employee.
-    # If an employee's payroll has multiple contracts, 
-    # then the generated payroll will grab the last contract it finds.
+
+    def _group_payslips_by_employee(self, payslips):
+        """
+        Groups the payslips by employee and contract in a single pass.
+
+        For each employee, the payslips are grouped by contract and the
+        contract of the group with the most recent period is selected, so
+        that employees with several contracts in the same month always get
+        the same contract, regardless of the order of the payslips.
+
+        Args:
+            payslips (RecordSet): The valid payslips of the month.
+
+        Returns:
+            dict: A dictionary with the employee id as key and a tuple with
+            the payslip ids and the selected contract id as value.
+        """
+        # {employee_id: {contract_id: [payslip, ...]}}
+        groups = {}
+        for payslip in payslips:
+            groups.setdefault(payslip.employee_id.id, {}).setdefault(
+                payslip.contract_id.id, []
+            ).append(payslip)
+
+        def period_key(payslip):
+            return (payslip.date_to, payslip.date_from, payslip.id)
+
+        res = {}
+        for employee_id, contracts in groups.items():
+            payslip_ids = []
+            contract_id = False
+            last_key = None
+            for contract_payslip_id, contract_payslips in contracts.items():
+                payslip_ids += [payslip.id for payslip in contract_payslips]
+                key = max(period_key(payslip) for payslip in contract_payslips)
+                if last_key is None or key > last_key:
+                    last_key = key
+                    contract_id = contract_payslip_id
+            res[employee_id] = (sorted(payslip_ids), contract_id)
+        return res
+
     def generate(self):
         """
         Generates Edi Payslips based on the current year and month.
 
-        This function searches for existing payslips and credit 
-        notes for the current year and month. It then filters 
-        out the valid payslips, deletes existing Edi Payslips 
-        in draft state, and creates new Edi Payslips in 
-        draft state without payslips. Finally, it adds the valid 
-        payslips to the Edi Payslips and updates the contract_id field.
+        This function searches for existing payslips and credit
+        notes for the current year and month. It then filters
+        out the valid payslips, deletes existing Edi Payslips
+        in draft state, and creates new Edi Payslips in
+        draft state without payslips. Finally, it groups the valid
+        payslips by employee and contract and sets the payslips and the
+        contract of each Edi Payslip with a single write.
+
+        If an employee has several contracts in the month, the contract
+        of the most recent period is used.
 
         Returns:
             dict: An action dictionary to update or redirect to the Edi Payslip view.
@@ -95,11 +137,9 @@ class EdiGen(models.TransientModel):
             ]
         )
         # Filtered valid Payslips
-        origin_payslip_list = []
-        for credit_note_rec in credit_note_recs:
-            origin_payslip_list.append(credit_note_rec.origin_payslip_id.id)
+        origin_payslip_ids = set(credit_note_recs.mapped("origin_payslip_id").ids)
         valid_payslips = payslip_recs.filtered(
-            lambda payslip: payslip.id not in origin_payslip_list
+            lambda payslip: payslip.id not in origin_payslip_ids
         )
         # Delete existing Edi Payslips in draft state
         for_delete_edi_payslip_recs = edi_payslip_env.search(
@@ -110,23 +150,29 @@ class EdiGen(models.TransientModel):
             ]
         )
         for_delete_edi_payslip_recs.unlink()
-        # Creating new Edi Payslips in draft state without payslips
-        for valid_payslip in valid_payslips:
-            existing_edi_payslip_recs = edi_payslip_env.search(
-                [
-                    ("year", "=", int(self.year)),
-                    ("month", "=", self.month),
-                    ("employee_id", "=", valid_payslip.employee_id.id),
-                ]
-            )
-            if not existing_edi_payslip_recs:
-                edi_payslip_env.create(
-                    {
-                        "year": int(self.year),
-                        "month": self.month,
-                        "employee_id": valid_payslip.employee_id.id,
-                    }
-                )
+        # Group the valid payslips by employee and contract
+        payslips_by_employee = self._group_payslips_by_employee(valid_payslips)
+        # Creating new Edi Payslips in draft state for the employees
+        # without Edi Payslips in the month
+        existing_edi_payslip_recs = edi_payslip_env.search(
+            [
+                ("year", "=", int(self.year)),
+                ("month", "=", self.month),
+                ("employee_id", "in", list(payslips_by_employee)),
+            ]
+        )
+        existing_employee_ids = set(existing_edi_payslip_recs.mapped("employee_id").ids)
+        edi_payslip_env.create(
+            [
+                {
+                    "year": int(self.year),
+                    "month": self.month,
+                    "employee_id": employee_id,
+                }
+                for employee_id in payslips_by_employee
+                if employee_id not in existing_employee_ids
+            ]
+        )
         # Adding Payslips to Edi Payslips
         # Search for existing Edi Payslips in draft state
         existing_edi_payslip_recs = edi_payslip_env.search(
@@ -137,23 +183,16 @@ class EdiGen(models.TransientModel):
             ]
         )
         for existing_edi_payslip_rec in existing_edi_payslip_recs:
-            # First remove existing Payslips in Edi Payslip
-            existing_edi_payslip_rec.write({"payslip_ids": [(5,)]})
-
-            # Filtered new Edi Payslips for an employee
-            valid_payslips_employee = valid_payslips.filtered(
-                lambda payslip: payslip.employee_id.id
-                == existing_edi_payslip_rec.employee_id.id
+            payslip_ids, contract_id = payslips_by_employee.get(
+                existing_edi_payslip_rec.employee_id.id, ([], False)
+            )
+            # Replace the Payslips and set the contract in a single write
+            existing_edi_payslip_rec.write(
+                {
+                    "payslip_ids": [(6, 0, payslip_ids)],
+                    "contract_id": contract_id,
+                }
             )
-
-            # Then add Payslips to Edi Payslip
-            for valid_payslip_employee in valid_payslips_employee:
-                existing_edi_payslip_rec.write(
-                    {
-                        "payslip_ids": [(4, valid_payslip_employee.id)],
-                        "contract_id": valid_payslip_employee.contract_id.id,
-                    }
-                )
         # To update or redirect to the Edi Payslip view
         return {
             "name": "Edi Payslips",
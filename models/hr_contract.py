@@ -22,6 +22,17 @@
 
 from odoo import fields, models, api
 
+# Maps the 'schedule_pay' values to the ids of the payroll periods
+PAYROLL_PERIODS = {
+    "monthly": 5,
+    "quarterly": 6,
+    "semi-annually": 6,
+    "annually": 6,
+    "weekly": 1,
+    "bi-weekly": 4,
+    "bi-monthly": 6,
+}
+
 
 class HrContract(models.Model):
     _inherit = "hr.contract"
@@ -41,7 +52,8 @@ class HrContract(models.Model):
         comodel_name="l10n_co_edi_jorels.payroll_periods",
         string="Payroll period",
         compute="_compute_payroll_period_id",
-        # store=True,
+        store=True,
+        index=True,
     )
 
     @api.depends("schedule_pay")
@@ -50,26 +62,17 @@ class HrContract(models.Model):
         This function computes the 'payroll_period_id' field based on the
         'schedule_pay' field of each record in the self iterable.
 
-        The function uses a dictionary to map the possible values of 'schedule_pay'
-        to the corresponding 'payroll_period_id' values.
+        The function uses the PAYROLL_PERIODS dictionary to map the possible
+        values of 'schedule_pay' to the corresponding 'payroll_period_id' values.
+        The field is stored, so it is only computed when 'schedule_pay' changes.
 
         If 'schedule_pay' is not present, 'payroll_period_id' is set to None.
         """
-        # Dictionary that maps 'schedule_pay' values to 'payroll_period_id' values
-        values = {
-            "monthly": 5,
-            "quarterly": 6,
-            "semi-annually": 6,
-            "annually": 6,
-            "weekly": 1,
-            "bi-weekly": 4,
-            "bi-monthly": 6,
-        }
         # Loop through each record in the self iterable
         for rec in self:
             # If 'schedule_pay' is present, set 'payroll_period_id' to the corresponding value
             if rec.schedule_pay:
-                rec.payroll_period_id = values[rec.schedule_pay]
+                rec.payroll_period_id = PAYROLL_PERIODS[rec.schedule_pay]
             # If 'schedule_pay' is not present, set 'payroll_period_id' to None
             else:
                 rec.payroll_period_id = None
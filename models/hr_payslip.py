@@ -19,8 +19,6 @@
 #   email: info@jorels.com
 #
 
-import calendar
-import json
 import logging
 from datetime import datetime, timedelta
 
@@ -28,8 +26,44 @@ from dateutil.relativedelta import relativedelta
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError, ValidationError
 
+from ..tools import co_calendar
+from .earn_line import ABSENCE_CATEGORIES
+
 _logger = logging.getLogger(__name__)
 
+# Absence categories without payment, whose days are counted without total
+UNPAID_ABSENCE_CATEGORIES = frozenset(
+    ["licensings_suspension_or_unpaid_leaves", "legal_strikes"]
+)
+
+# Lists of absences of the JSON request, in the order their days are
+# subtracted from the worked days
+ABSENCE_REQUEST_LISTS = [
+    "vacation_common",
+    "licensings_maternity_or_paternity_leaves",
+    "licensings_permit_or_paid_licenses",
+    "licensings_suspension_or_unpaid_leaves",
+    "incapacities",
+    "legal_strikes",
+]
+
+# Incapacity codes of the incapacity categories
+INCAPACITY_CODES = {
+    "incapacities_common": 1,
+    "incapacities_professional": 2,
+    "incapacities_working": 3,
+}
+
+
+def absence_quantities(absences):
+    """
+    Returns the quantities of the absences of a payslip, as returned by
+    `_get_absences`, in the order they are subtracted from the worked days.
+    """
+    return [
+        item["quantity"] for key in ABSENCE_REQUEST_LISTS for item in absences[key]
+    ]
+
 
 class HrPayslip(models.Model):
     _name = "hr.payslip"
@@ -354,18 +388,16 @@ class HrPayslip(models.Model):
         # The sheet and the totals are calculated again,
         # just in case the totals obtained initially are used to calculate some salary rule.
         # Especially the field worked_days_total
+        settings = self.env.company._get_payroll_settings()
         try:
-            if int(
-                self.env["ir.config_parameter"]
-                .sudo()
-                .get_param("jorels.payroll.recompute_sheet", 1)
-            ):
-                res = super(HrPayslip, self).compute_sheet()
-                self.compute_totals()
-        except ValueError as e:
+            recompute_sheet = int(settings.recompute_sheet)
+        except ValueError:
             raise UserError(
                 "The system parameter 'jorels.payroll.recompute_sheet' is misconfigured. Use only 0 or 1"
             )
+        if recompute_sheet:
+            res = super(HrPayslip, self).compute_sheet()
+            self.compute_totals()
         return res
 
     def compute_totals(self):
@@ -417,9 +449,7 @@ class HrPayslip(models.Model):
             rec.total_amount = accrued_total_amount - deductions_total_amount
 
             # Update the EDI payload field
-            rec.edi_payload = json.dumps(
-                rec.get_json_request(), indent=4, sort_keys=False
-            )
+            rec.edi_payload = rec._encode_edi_payload(rec.get_json_request())
 
     @api.model
     def calculate_time_worked(self, start, end):
@@ -436,21 +466,104 @@ class HrPayslip(models.Model):
         """
         if end < start:
             raise ValidationError(_("The time worked cannot be negative."))
-        end_day = (
-            30 if end.day == calendar.monthrange(end.year, end.month)[1] else end.day
-        )
-        start_day = (
-            30
-            if start.day == calendar.monthrange(start.year, start.month)[1]
-            else start.day
-        )
-        return (
-            (end.year - start.year) * 360
-            + (end.month - start.month) * 30
-            + end_day
-            - start_day
-            + 1
+        return co_calendar.days_360(start, end)
+
+    def _get_absences(self, compute_quantity=False):
+        """
+        Returns the absences of every payslip as they are sent in the JSON
+        request, by list of the request: the detailed earn lines and the
+        salary lines of the absence categories, with their days.
+
+        Args:
+            compute_quantity (bool): Compute the EDI quantity of the salary
+                lines of absences first. Otherwise, it must be already computed.
+
+        Returns:
+            dict: The lists of absences by key of ABSENCE_REQUEST_LISTS, by
+            payslip id.
+        """
+        res = {}
+        for rec in self:
+            absences = {key: [] for key in ABSENCE_REQUEST_LISTS}
+            for earn_id in rec.earn_ids:
+                category = earn_id.category
+                if category not in ABSENCE_CATEGORIES or not earn_id.quantity:
+                    continue
+                paid = category not in UNPAID_ABSENCE_CATEGORIES
+                if paid and not earn_id.total:
+                    continue
+                item = {
+                    "start": fields.Date.to_string(earn_id.date_start),
+                    "end": fields.Date.to_string(earn_id.date_end),
+                    "quantity": abs(earn_id.quantity),
+                }
+                if category in INCAPACITY_CODES:
+                    item["incapacity_code"] = INCAPACITY_CODES[category]
+                    category = "incapacities"
+                if paid:
+                    item["payment"] = abs(earn_id.total)
+                absences[category].append(item)
+            for line_id in rec.line_ids:
+                rule = line_id.salary_rule_id
+                category = rule.earn_category
+                if (
+                    rule.type_concept != "earn"
+                    or rule.edi_is_detailed
+                    or category not in ABSENCE_CATEGORIES
+                ):
+                    continue
+                if compute_quantity:
+                    line_id.edi_quantity = line_id.compute_edi_quantity()
+                if not line_id.edi_quantity:
+                    continue
+                paid = category not in UNPAID_ABSENCE_CATEGORIES
+                if paid and not line_id.total:
+                    continue
+                item = {"quantity": abs(line_id.edi_quantity)}
+                if category in INCAPACITY_CODES:
+                    item["incapacity_code"] = INCAPACITY_CODES[category]
+                    category = "incapacities"
+                if paid:
+                    item["payment"] = abs(line_id.total)
+                absences[category].append(item)
+            res[rec.id] = absences
+        return res
+
+    def compute_worked_days(self):
+        """
+        Computes the worked days of the draft payslips of the recordset at
+        once and writes them in 'worked_days_total'. The other payslips are
+        skipped, their worked days may already be reported to the DIAN.
+
+        The dates and the quantities of the absences are read as sequences and
+        the worked days are computed in one pass with the precomputed calendar,
+        instead of payslip by payslip. The payslips are written grouped by
+        their number of days, so there is a write per distinct value.
+
+        Raises:
+            ValidationError: If a payslip ends before it starts.
+
+        Returns:
+            dict: The worked days by payslip id.
+        """
+        drafts = self.filtered(lambda rec: rec.state == "draft")
+        for rec in drafts:
+            if rec.date_to < rec.date_from:
+                raise ValidationError(_("The time worked cannot be negative."))
+        absences = drafts._get_absences(compute_quantity=True)
+        days = co_calendar.worked_days_many(
+            drafts.mapped("date_from"),
+            drafts.mapped("date_to"),
+            [absence_quantities(absences[rec_id]) for rec_id in drafts.ids],
         )
+        worked_days = dict(zip(drafts.ids, days))
+        ids_by_days = {}
+        for rec in drafts:
+            if rec.worked_days_total != worked_days[rec.id]:
+                ids_by_days.setdefault(worked_days[rec.id], []).append(rec.id)
+        for value, ids in ids_by_days.items():
+            self.browse(ids).write({"worked_days_total": value})
+        return worked_days
 
     def get_json_request(self):
         """
@@ -523,7 +636,8 @@ class HrPayslip(models.Model):
                 raise UserError(_("The payroll must have a payment method"))
             if not rec.payment_date:
                 raise UserError(_("The payroll must have a payment date"))
-            rec.edi_sync = rec.company_id.edi_payroll_is_not_test
+            settings = rec.company_id._get_payroll_settings()
+            rec.edi_sync = settings.edi_payroll_is_not_test
             sequence = {}
             if rec.number and rec.number not in ("New", _("New")):
                 sequence_number = "".join([i for i in rec.number if i.isdigit()])
@@ -628,15 +742,9 @@ class HrPayslip(models.Model):
             commissions = []
             compensations = []
             overtimes_surcharges = []
-            incapacities = []
-            legal_strikes = []
-            licensings_maternity_or_paternity_leaves = []
-            licensings_permit_or_paid_licenses = []
-            licensings_suspension_or_unpaid_leaves = []
             other_concepts = []
             third_party_payments = []
             transports = []
-            vacation_common = []
             vacation_compensated = []
             vouchers = []
             # Earn details iteration
@@ -736,77 +844,6 @@ class HrPayslip(models.Model):
                                 "payment": abs(earn_id.total),
                             }
                         )
-                elif earn_id.category == "incapacities_common":
-                    if earn_id.quantity and earn_id.total:
-                        incapacities.append(
-                            {
-                                "start": fields.Date.to_string(earn_id.date_start),
-                                "end": fields.Date.to_string(earn_id.date_end),
-                                "quantity": abs(earn_id.quantity),
-                                "incapacity_code": 1,
-                                "payment": abs(earn_id.total),
-                            }
-                        )
-                elif earn_id.category == "incapacities_professional":
-                    if earn_id.quantity and earn_id.total:
-                        incapacities.append(
-                            {
-                                "start": fields.Date.to_string(earn_id.date_start),
-                                "end": fields.Date.to_string(earn_id.date_end),
-                                "quantity": abs(earn_id.quantity),
-                                "incapacity_code": 2,
-                                "payment": abs(earn_id.total),
-                            }
-                        )
-                elif earn_id.category == "incapacities_working":
-                    if earn_id.quantity and earn_id.total:
-                        incapacities.append(
-                            {
-                                "start": fields.Date.to_string(earn_id.date_start),
-                                "end": fields.Date.to_string(earn_id.date_end),
-                                "quantity": abs(earn_id.quantity),
-                                "incapacity_code": 3,
-                                "payment": abs(earn_id.total),
-                            }
-                        )
-                elif earn_id.category == "legal_strikes":
-                    if earn_id.quantity:
-                        legal_strikes.append(
-                            {
-                                "start": fields.Date.to_string(earn_id.date_start),
-                                "end": fields.Date.to_string(earn_id.date_end),
-                                "quantity": abs(earn_id.quantity),
-                            }
-                        )
-                elif earn_id.category == "licensings_maternity_or_paternity_leaves":
-                    if earn_id.quantity and earn_id.total:
-                        licensings_maternity_or_paternity_leaves.append(
-                            {
-                                "start": fields.Date.to_string(earn_id.date_start),
-                                "end": fields.Date.to_string(earn_id.date_end),
-                                "quantity": abs(earn_id.quantity),
-                                "payment": abs(earn_id.total),
-                            }
-                        )
-                elif earn_id.category == "licensings_permit_or_paid_licenses":
-                    if earn_id.quantity and earn_id.total:
-                        licensings_permit_or_paid_licenses.append(
-                            {
-                                "start": fields.Date.to_string(earn_id.date_start),
-                                "end": fields.Date.to_string(earn_id.date_end),
-                                "quantity": abs(earn_id.quantity),
-                                "payment": abs(earn_id.total),
-                            }
-                        )
-                elif earn_id.category == "licensings_suspension_or_unpaid_leaves":
-                    if earn_id.quantity:
-                        licensings_suspension_or_unpaid_leaves.append(
-                            {
-                                "start": fields.Date.to_string(earn_id.date_start),
-                                "end": fields.Date.to_string(earn_id.date_end),
-                                "quantity": abs(earn_id.quantity),
-                            }
-                        )
                 elif earn_id.category == "other_concepts":
                     if earn_id.total:
                         other_concepts.append(
@@ -892,16 +929,6 @@ class HrPayslip(models.Model):
                 elif earn_id.category == "transports_viatic":
                     if earn_id.total:
                         transports.append({"viatic": abs(earn_id.total)})
-                elif earn_id.category == "vacation_common":
-                    if earn_id.quantity and earn_id.total:
-                        vacation_common.append(
-                            {
-                                "start": fields.Date.to_string(earn_id.date_start),
-                                "end": fields.Date.to_string(earn_id.date_end),
-                                "quantity": abs(earn_id.quantity),
-                                "payment": abs(earn_id.total),
-                            }
-                        )
                 elif earn_id.category == "vacation_compensated":
                     if earn_id.quantity and earn_id.total:
                         vacation_compensated.append(
@@ -1107,71 +1134,6 @@ class HrPayslip(models.Model):
                                     "payment": abs(line_id.total),
                                 }
                             )
-                    elif line_id.salary_rule_id.earn_category == "incapacities_common":
-                        if line_id.edi_quantity and line_id.total:
-                            incapacities.append(
-                                {
-                                    "quantity": abs(line_id.edi_quantity),
-                                    "incapacity_code": 1,
-                                    "payment": abs(line_id.total),
-                                }
-                            )
-                    elif (
-                        line_id.salary_rule_id.earn_category
-                        == "incapacities_professional"
-                    ):
-                        if line_id.edi_quantity and line_id.total:
-                            incapacities.append(
-                                {
-                                    "quantity": abs(line_id.edi_quantity),
-                                    "incapacity_code": 2,
-                                    "payment": abs(line_id.total),
-                                }
-                            )
-                    elif line_id.salary_rule_id.earn_category == "incapacities_working":
-                        if line_id.edi_quantity and line_id.total:
-                            incapacities.append(
-                                {
-                                    "quantity": abs(line_id.edi_quantity),
-                                    "incapacity_code": 3,
-                                    "payment": abs(line_id.total),
-                                }
-                            )
-                    elif line_id.salary_rule_id.earn_category == "legal_strikes":
-                        if line_id.edi_quantity:
-                            legal_strikes.append(
-                                {"quantity": abs(line_id.edi_quantity)}
-                            )
-                    elif (
-                        line_id.salary_rule_id.earn_category
-                        == "licensings_maternity_or_paternity_leaves"
-                    ):
-                        if line_id.edi_quantity and line_id.total:
-                            licensings_maternity_or_paternity_leaves.append(
-                                {
-                                    "quantity": abs(line_id.edi_quantity),
-                                    "payment": abs(line_id.total),
-                                }
-                            )
-                    elif (
-                        line_id.salary_rule_id.earn_category
-                        == "licensings_permit_or_paid_licenses"
-                    ):
-                        if line_id.edi_quantity and line_id.total:
-                            licensings_permit_or_paid_licenses.append(
-                                {
-                                    "quantity": abs(line_id.edi_quantity),
-                                    "payment": abs(line_id.total),
-                                }
-                            )
-                    elif (
-                        line_id.salary_rule_id.earn_category
-                        == "licensings_suspension_or_unpaid_leaves"
-                    ):
-                        if line_id.edi_quantity:
-                            licensings_suspension_or_unpaid_leaves.append(
-                                {"quantity": abs(line_id.edi_quantity)}
-                            )
                     elif line_id.salary_rule_id.earn_category == "other_concepts":
                         if line_id.total:
                             other_concepts.append(
@@ -1253,14 +1215,6 @@ class HrPayslip(models.Model):
                     elif line_id.salary_rule_id.earn_category == "transports_viatic":
                         if line_id.total:
                             transports.append({"viatic": abs(line_id.total)})
-                    elif line_id.salary_rule_id.earn_category == "vacation_common":
-                        if line_id.edi_quantity and line_id.total:
-                            vacation_common.append(
-                                {
-                                    "quantity": abs(line_id.edi_quantity),
-                                    "payment": abs(line_id.total),
-                                }
-                            )
                     elif line_id.salary_rule_id.earn_category == "vacation_compensated":
                         if line_id.edi_quantity and line_id.total:
                             vacation_compensated.append(
@@ -1374,23 +1328,28 @@ class HrPayslip(models.Model):
                         deduction_third_party_payments.append(
                             {"payment": abs(line_id.total)}
                         )
+            # Absences, with the EDI quantities computed above
+            absences = rec._get_absences()[rec.id]
+            vacation_common = absences["vacation_common"]
+            licensings_maternity_or_paternity_leaves = absences[
+                "licensings_maternity_or_paternity_leaves"
+            ]
+            licensings_permit_or_paid_licenses = absences[
+                "licensings_permit_or_paid_licenses"
+            ]
+            licensings_suspension_or_unpaid_leaves = absences[
+                "licensings_suspension_or_unpaid_leaves"
+            ]
+            incapacities = absences["incapacities"]
+            legal_strikes = absences["legal_strikes"]
             # Calculate days worked
-            rec.worked_days_total = self.calculate_time_worked(
-                rec.date_from, rec.date_to
+            worked_days = co_calendar.subtract_absences(
+                self.calculate_time_worked(rec.date_from, rec.date_to),
+                absence_quantities(absences),
             )
-            for list_with_days in [
-                vacation_common,
-                licensings_maternity_or_paternity_leaves,
-                licensings_permit_or_paid_licenses,
-                licensings_suspension_or_unpaid_leaves,
-                incapacities,
-                legal_strikes,
-            ]:
-                for dict_with_days in list_with_days:
-                    rec.worked_days_total -= dict_with_days["quantity"]
-            if rec.worked_days_total < 0:
-                rec.worked_days_total = 0
-            basic["worked_days"] = rec.worked_days_total
+            if rec.worked_days_total != worked_days:
+                rec.worked_days_total = worked_days
+            basic["worked_days"] = worked_days
 
             if "worker_salary" not in basic:
                 basic["worker_salary"] = 0.0
@@ -1579,9 +1538,10 @@ class HrPayslip(models.Model):
         """
         for rec in self:
             # Check if DIAN payroll is enabled and consolidated payroll is not enabled
+            settings = rec.company_id._get_payroll_settings()
             if (
-                not rec.company_id.edi_payroll_enable
-                or rec.company_id.edi_payroll_consolidated_enable
+                not settings.edi_payroll_enable
+                or settings.edi_payroll_consolidated_enable
             ):
                 # If not, skip the validation process
                 continue
@@ -1607,30 +1567,26 @@ class HrPayslip(models.Model):
         """
         Marks the payslip as done by generating a number based on certain conditions.
         If the number is not set or is equal to "New", a new number is generated.
-        Handles credit notes by assigning the appropriate sequence number.
+        The numbers of the whole recordset are reserved as a block, with a single
+        call to the sequence of payslips and another one to the sequence of
+        adjustment notes.
         Validates the payslip if specific company flags are set.
         Returns the result of the superclass action_payslip_done method.
         """
-        for rec in self:
-            if not rec.number or rec.number in ("New", _("New")):
-                if rec.credit_note:
-                    rec.number = self.env["ir.sequence"].next_by_code(
-                        "salary.slip.note"
-                    )
-                    if not rec.number:
-                        raise UserError(
-                            _(
-                                "You must create a sequence for adjusment notes with code 'salary.slip.note'"
-                            )
-                        )
-                else:
-                    rec.number = self.env["ir.sequence"].next_by_code("salary.slip")
+        # The numbers are reserved as a block for the whole recordset
+        without_number = self.filtered(
+            lambda rec: not rec.number or rec.number in ("New", _("New"))
+        )
+        credit_notes = without_number.filtered("credit_note")
+        credit_notes._assign_sequence_numbers("salary.slip.note")
+        (without_number - credit_notes)._assign_sequence_numbers("salary.slip")
         res = super(HrPayslip, self).action_payslip_done()
         for rec in self:
+            settings = rec.company_id._get_payroll_settings()
             if (
-                rec.company_id.edi_payroll_enable
-                and not rec.company_id.edi_payroll_consolidated_enable
-                and not rec.company_id.edi_payroll_enable_validate_state
+                settings.edi_payroll_enable
+                and not settings.edi_payroll_consolidated_enable
+                and not settings.edi_payroll_enable_validate_state
             ):
                 rec.validate_dian_generic()
         return res
@@ -1646,36 +1602,37 @@ class HrPayslip(models.Model):
         """
         for rec in self:
             # Check if DIAN payroll is enabled and consolidated payroll is not enabled
+            settings = rec.company_id._get_payroll_settings()
             if (
-                not rec.company_id.edi_payroll_enable
-                or rec.company_id.edi_payroll_consolidated_enable
+                not settings.edi_payroll_enable
+                or settings.edi_payroll_consolidated_enable
             ):
                 # If not, skip the status_zip process
                 continue
             # This line ensures that the electronic fields of the payroll
             # are updated in Odoo, before the request.
             # Generate JSON request data
-            payload = json.dumps(rec.get_json_request(), indent=2, sort_keys=False)
+            payload = rec.get_json_request()
             # Call the helper method to perform the status_zip
             rec._status_zip(payload)
 
     def refund_sheet(self):
         """
-        Creates a refund payslip based on the current payslip.
+        Creates a refund payslip for every payslip of the recordset.
 
-        This function creates a refund payslip by copying the current payslip
-        and setting the 'credit_note' field to True. It also updates the name,
-        origin_payslip_id, and number fields of the refund payslip.
-        The refund payslip is then marked as 'done' by calling the
-        'action_payslip_done' method.
+        This function creates the refund payslips by copying the payslips
+        as a batch and setting the 'credit_note' field to True. It also updates
+        the name, origin_payslip_id, and number fields of the refund payslips.
+        The refund payslips are then computed and marked as 'done' together,
+        so their numbers are reserved as a block.
 
-        If the current payslip has an 'edi_payload' field and the refund
+        If a payslip has an 'edi_payload' field and its refund
         payslip does not have an 'edi_payload' field, the function generates
         the JSON request payload for the refund payslip and writes it to the
         'edi_payload' field.
 
         The function returns an action window dictionary that specifies
-        the parameters for opening a window displaying the refund payslip.
+        the parameters for opening a window displaying all the refund payslips.
         The 'name' field specifies the title of the window. The 'view_mode'
         field specifies the display mode of the window as 'tree, form'.
         The 'view_id' field is set to False. The 'view_type' field specifies
@@ -1697,33 +1654,39 @@ class HrPayslip(models.Model):
         # The following line is commented, because if applied, the sequence is incorrectly calculated
         # and the relationship to the original payroll would not be taken by default
         # res = super(HrPayslip, self).refund_sheet()
-        copied_payslip = None
-        for payslip in self:
-            if payslip.credit_note:
-                raise UserError(
-                    _("A adjustment note should not be made to a adjustment note")
-                )
-            copied_payslip = payslip.copy(
+        if any(self.mapped("credit_note")):
+            raise UserError(
+                _("A adjustment note should not be made to a adjustment note")
+            )
+        # All the adjustment notes are copied, computed and numbered as a batch
+        copied_payslips = self._copy_multi(
+            [
                 {
                     "credit_note": True,
                     "name": _("Refund: ") + payslip.name,
                     "origin_payslip_id": payslip.id,
                     "number": _("New"),
                 }
-            )
-            # It is important to call compute_sheet here,
-            # so that the accounting of the adjustment notes works well.
-            copied_payslip.compute_sheet()
-            copied_payslip.action_payslip_done()
-            if payslip.edi_payload and not copied_payslip.edi_payload:
+                for payslip in self
+            ]
+        )
+        # It is important to call compute_sheet here,
+        # so that the accounting of the adjustment notes works well.
+        copied_payslips.compute_sheet()
+        copied_payslips.action_payslip_done()
+        for copied_payslip in copied_payslips:
+            if (
+                copied_payslip.origin_payslip_id.edi_payload
+                and not copied_payslip.edi_payload
+            ):
                 payload = copied_payslip.get_json_request()
                 copied_payslip.write(
-                    {"edi_payload": json.dumps(payload, indent=2, sort_keys=False)}
+                    {"edi_payload": copied_payslip._encode_edi_payload(payload)}
                 )
         formview_ref = self.env.ref("hr_payroll_community.view_hr_payslip_form", False)
         treeview_ref = self.env.ref("hr_payroll_community.view_hr_payslip_tree", False)
-        if copied_payslip is not None:
-            domain = "[('id', 'in', %s)]" % copied_payslip.ids
+        if copied_payslips:
+            domain = "[('id', 'in', %s)]" % copied_payslips.ids
         else:
             domain = "[(credit_note, '=', True)]"
         return {
@@ -1754,9 +1717,10 @@ class HrPayslip(models.Model):
         for rec in self:
             # If the company has not enabled the EDI payroll feature or
             # the consolidated feature is disabled, skip to the next record
+            settings = rec.company_id._get_payroll_settings()
             if (
-                not rec.company_id.edi_payroll_enable
-                or rec.company_id.edi_payroll_consolidated_enable
+                not settings.edi_payroll_enable
+                or settings.edi_payroll_consolidated_enable
             ):
                 continue
 
@@ -20,15 +20,31 @@
 #
 
 import datetime as dt
-import json
 import logging
+import os
+import re
+import time
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import babel
 from odoo import api, fields, models, tools, _
 from odoo.exceptions import UserError
 
+from ..tools import payload as payload_tools
+
 _logger = logging.getLogger(__name__)
 
+# Number of Edi payslips rendered by each wkhtmltopdf run of a PDF export
+PDF_EXPORT_CHUNK_SIZE = 50
+
+# The zip files of the PDF exports are removed after this number of seconds
+PDF_EXPORT_MAX_AGE = 24 * 60 * 60
+
+PDF_EXPORT_TOKEN = re.compile(r"^[0-9a-f]{32}$")
+
 
 class HrPayslipEdi(models.Model):
     _name = "hr.payslip.edi"
@@ -246,53 +262,44 @@ class HrPayslipEdi(models.Model):
 
         Compute the sheet for the given records.
 
-        This function iterates over each record in the current recordset
-        and performs the following actions:
-        1. Sets the "number" field of the record to the value of
-            the "number" field if it exists, otherwise sets it to "New".
-        2. Sets the "date" field of the record to the current date.
-        3. Writes the "number" and "date" fields to the record.
-        4. Generates the JSON payload for the record using the "get_json_request" method.
-        5. Serializes the payload into a string using `json.dumps`.
-        6. Writes the "edi_sync", "edi_is_not_test", and "edi_payload" fields to the record.
+        The whole recordset is computed as a batch:
+        1. Sets the "number" field of the records without number to "New"
+            and the "date" field of all the records to the current date.
+        2. Consolidates the payloads of the payslips of every record in a
+            single pass.
+        3. Writes the totals, the "edi_sync", "edi_is_not_test" and
+            "edi_payload" fields with a single write per record.
 
         Returns:
             bool: True if the computation is successful.
         """
+        # The date is the sending date
+        date = fields.Date.context_today(self)
+        # Save
+        self.filtered(lambda rec: not rec.number).write({"number": _("New")})
+        self.write({"date": date})
+        # Payload
+        json_requests = self._prepare_json_requests()
         for rec in self:
-            number = rec.number or _("New")
-            # The date is the sending date
-            date = fields.Date.context_today(self)
-            # Save
-            rec.write(
+            json_request, vals = json_requests[rec.id]
+            settings = rec.company_id._get_payroll_settings()
+            vals.update(
                 {
-                    "number": number,
-                    "date": date,
+                    "edi_sync": settings.edi_payroll_is_not_test,
+                    "edi_is_not_test": settings.edi_payroll_is_not_test,
+                    "edi_payload": rec._encode_edi_payload(json_request),
                 }
             )
-            # Payload
-            payload = rec.get_json_request()
-            edi_payload = json.dumps(payload, indent=4, sort_keys=False)
             # Save
-            rec.write(
-                {
-                    "edi_sync": rec.company_id.edi_payroll_is_not_test,
-                    "edi_is_not_test": rec.company_id.edi_payroll_is_not_test,
-                    "edi_payload": edi_payload,
-                }
-            )
+            rec.write(vals)
         return True
 
-    def get_json_request(self):
+    def _check_json_request_fields(self):
         """
         Validates the required fields for generating a JSON request for the payroll.
 
         Raises UserError if any of the mandatory fields are missing for the company,
         contract, employee, or payroll.
-
-        Returns a JSON object containing the necessary information for the
-        payroll request including payment details, accrued and deducted amounts,
-        worked days, notes, and credit note details.
         """
         for rec in self:
             if not rec.number:
@@ -355,30 +362,39 @@ class HrPayslipEdi(models.Model):
                 raise UserError(_("The payroll must have a month"))
             if not rec.year:
                 raise UserError(_("The payroll must have a year"))
-            sequence = {}
-            if rec.number and rec.number not in ("New", _("New")):
-                sequence_number = "".join([i for i in rec.number if i.isdigit()])
-                sequence_prefix = rec.number.split(sequence_number)
-                if sequence_prefix:
-                    sequence = {
-                        # "worker_code": "string",
-                        "prefix": sequence_prefix[0],
-                        "number": int(sequence_number),
-                    }
-                else:
-                    raise UserError(_("The sequence must have a prefix"))
-            json_request = {}
+
+    def _consolidate_payslips(self):
+        """
+        Consolidates the payloads of the payslips of every record.
+
+        Returns:
+            dict: The consolidated payload of every record, by record id.
+        """
+        batch = [
+            (
+                rec.id,
+                rec.payslip_ids.mapped("edi_payload"),
+                fields.Date.to_string(rec.date),
+            )
+            for rec in self
+        ]
+        return dict(payload_tools.consolidate_payloads_batch(batch))
+
+    def _prepare_json_requests(self):
+        """
+        Prepares the JSON requests of the whole recordset, without writing them.
+
+        Returns:
+            dict: A tuple (json_request, vals) by record id, where vals are the
+            values of the totals and payment fields to be written in the record.
+        """
+        self._check_json_request_fields()
+        consolidated = self._consolidate_payslips()
+        res = {}
+        for rec in self:
+            sequence = rec._get_json_sequence()
             # Others fields
-            if rec.payslip_ids:
-                for index, payslip in enumerate(rec.payslip_ids):
-                    if index > 0:
-                        json_request = rec.join_dicts(
-                            json_request,
-                            json.loads(payslip.edi_payload),
-                            fields.Date.to_string(rec.date),
-                        )
-                    else:
-                        json_request = json.loads(payslip.edi_payload)
+            json_request = consolidated[rec.id]
             # Sequence
             if sequence:
                 json_request["sequence"] = sequence
@@ -386,36 +402,112 @@ class HrPayslipEdi(models.Model):
             if rec.note:
                 notes = [{"text": rec.note}]
                 json_request["notes"] = notes
-            # Save
-            rec.write(
-                {
-                    "payment_form_id": json_request["payment"]["code"],
-                    "payment_method_id": json_request["payment"]["method_code"],
-                    "accrued_total_amount": json_request["accrued_total"],
-                    "deductions_total_amount": json_request["deductions_total"],
-                    "total_amount": json_request["total"],
-                    "worked_days_total": json_request["earn"]["basic"]["worked_days"],
-                }
-            )
+            vals = {
+                "payment_form_id": json_request["payment"]["code"],
+                "payment_method_id": json_request["payment"]["method_code"],
+                "accrued_total_amount": json_request["accrued_total"],
+                "deductions_total_amount": json_request["deductions_total"],
+                "total_amount": json_request["total"],
+                "worked_days_total": json_request["earn"]["basic"]["worked_days"],
+            }
             # Credit note
             if rec.credit_note:
-                if rec.origin_payslip_id:
-                    if rec.origin_payslip_id.edi_is_valid:
-                        json_request["payroll_reference"] = {
-                            "number": rec.origin_payslip_id.edi_number,
-                            "uuid": rec.origin_payslip_id.edi_uuid,
-                            "issue_date": str(rec.origin_payslip_id.edi_issue_date),
-                        }
-                    else:
-                        json_request["payroll_reference"] = {
-                            "number": rec.origin_payslip_id.number,
-                            "issue_date": str(rec.origin_payslip_id.date),
-                        }
-                else:
-                    raise UserError(
-                        _("The Origin payslip is required for adjusment notes.")
-                    )
+                json_request["payroll_reference"] = rec._get_json_payroll_reference()
                 json_request = rec.get_json_delete_request(json_request)
+            res[rec.id] = (json_request, vals)
+        return res
+
+    def _get_json_sequence(self):
+        """
+        Returns the sequence of the JSON request, built from the 'number' field.
+
+        Returns:
+            dict: The prefix and the number of the sequence, or an empty
+            dictionary if the payroll does not have a number yet.
+        """
+        self.ensure_one()
+        sequence = {}
+        if self.number and self.number not in ("New", _("New")):
+            sequence_number = "".join([i for i in self.number if i.isdigit()])
+            sequence_prefix = self.number.split(sequence_number)
+            if sequence_prefix:
+                sequence = {
+                    # "worker_code": "string",
+                    "prefix": sequence_prefix[0],
+                    "number": int(sequence_number),
+                }
+            else:
+                raise UserError(_("The sequence must have a prefix"))
+        return sequence
+
+    def _get_json_payroll_reference(self):
+        """
+        Returns the reference to the origin payslip of an adjustment note.
+
+        Raises UserError if the adjustment note does not have an origin payslip.
+
+        Returns:
+            dict: The number, the issue date and, if it was validated, the
+            uuid of the origin payslip.
+        """
+        self.ensure_one()
+        if not self.origin_payslip_id:
+            raise UserError(_("The Origin payslip is required for adjusment notes."))
+        if self.origin_payslip_id.edi_is_valid:
+            return {
+                "number": self.origin_payslip_id.edi_number,
+                "uuid": self.origin_payslip_id.edi_uuid,
+                "issue_date": str(self.origin_payslip_id.edi_issue_date),
+            }
+        return {
+            "number": self.origin_payslip_id.number,
+            "issue_date": str(self.origin_payslip_id.date),
+        }
+
+    def _get_json_delete_request_from_origin(self):
+        """
+        Builds the JSON request of an adjustment note as a transformation of
+        the payload already stored in its origin payslip, without
+        consolidating the payslips again.
+
+        Returns:
+            dict: The delete request, or None if the origin payslip does not
+            have a valid stored payload.
+        """
+        self.ensure_one()
+        if not self.origin_payslip_id.edi_payload:
+            return None
+        try:
+            json_request = self.origin_payslip_id._decode_edi_payload()
+        except ValueError:
+            return None
+        if not isinstance(json_request, dict) or "information" not in json_request:
+            return None
+        # The fields of the origin are replaced with the ones of the note
+        json_request.pop("sequence", None)
+        sequence = self._get_json_sequence()
+        if sequence:
+            json_request["sequence"] = sequence
+        if self.note:
+            json_request["notes"] = [{"text": self.note}]
+        json_request["payroll_reference"] = self._get_json_payroll_reference()
+        return self.get_json_delete_request(json_request)
+
+    def get_json_request(self):
+        """
+        Validates the required fields for generating a JSON request for the payroll.
+
+        Raises UserError if any of the mandatory fields are missing for the company,
+        contract, employee, or payroll.
+
+        Returns a JSON object containing the necessary information for the
+        payroll request including payment details, accrued and deducted amounts,
+        worked days, notes, and credit note details.
+        """
+        for rec in self:
+            json_request, vals = rec._prepare_json_requests()[rec.id]
+            # Save
+            rec.write(vals)
             return json_request
 
     def validate_dian_generic(self):
@@ -436,9 +528,10 @@ class HrPayslipEdi(models.Model):
         the generated JSON request data as the argument.
         """
         for rec in self:
+            settings = rec.company_id._get_payroll_settings()
             if (
-                not rec.company_id.edi_payroll_enable
-                or not rec.company_id.edi_payroll_consolidated_enable
+                not settings.edi_payroll_enable
+                or not settings.edi_payroll_consolidated_enable
                 or rec.edi_is_valid
             ):
                 continue
@@ -465,38 +558,37 @@ class HrPayslipEdi(models.Model):
         """
         Action to mark the payslip as done.
 
-        This method iterates over each record in the current recordset and performs
-        the following actions:
-        1. Checks if the record's state is not "draft". If it is not, the record is skipped.
-        2. Checks if the record's number is empty or equal to "New" or _("New").
-            If it is, a new sequence number is generated based on the credit note flag.
-        3. If the "without_compute_sheet" context flag is not set,
-            the compute_sheet() method is called.
-        4. Writes the state of the record as "done".
-        5. Checks if the company's edi_payroll_enable and edi_payroll_consolidated_enable
+        This method performs the following actions on the records in "draft" state:
+        1. Assigns a new sequence number to the records whose number is empty
+            or equal to "New" or _("New"). The numbers are reserved as a block,
+            with a single call to the sequence of Edi payslips and another one
+            to the sequence of adjustment notes.
+        2. If the "without_compute_sheet" context flag is not set,
+            the compute_sheet() method is called for all of them as a batch.
+        3. Writes the state of the records as "done".
+        4. Checks if the company's edi_payroll_enable and edi_payroll_consolidated_enable
             flags are True and if edi_payroll_enable_validate_state flag is False.
             If all conditions are met, the validate_dian_generic() method is called.
 
         Returns:
             bool: True if the action is successful, False otherwise.
         """
-        for rec in self:
-            if rec.state != "draft":
-                continue
-            if not rec.number or rec.number in ("New", _("New")):
-                if rec.credit_note:
-                    rec.number = self.env["ir.sequence"].next_by_code(
-                        "salary.slip.edi.note"
-                    )
-                else:
-                    rec.number = self.env["ir.sequence"].next_by_code("salary.slip.edi")
-            if not self.env.context.get("without_compute_sheet"):
-                rec.compute_sheet()
-            rec.write({"state": "done"})
+        drafts = self.filtered(lambda rec: rec.state == "draft")
+        without_number = drafts.filtered(
+            lambda rec: not rec.number or rec.number in ("New", _("New"))
+        )
+        credit_notes = without_number.filtered("credit_note")
+        credit_notes._assign_sequence_numbers("salary.slip.edi.note")
+        (without_number - credit_notes)._assign_sequence_numbers("salary.slip.edi")
+        if not self.env.context.get("without_compute_sheet"):
+            drafts.compute_sheet()
+        drafts.write({"state": "done"})
+        for rec in drafts:
+            settings = rec.company_id._get_payroll_settings()
             if (
-                rec.company_id.edi_payroll_enable
-                and rec.company_id.edi_payroll_consolidated_enable
-                and not rec.company_id.edi_payroll_enable_validate_state
+                settings.edi_payroll_enable
+                and settings.edi_payroll_consolidated_enable
+                and not settings.edi_payroll_enable_validate_state
             ):
                 rec.validate_dian_generic()
         return True
@@ -513,33 +605,34 @@ class HrPayslipEdi(models.Model):
         - rec: The record being processed
         """
         for rec in self:
+            settings = rec.company_id._get_payroll_settings()
             if (
-                not rec.company_id.edi_payroll_enable
-                or not rec.company_id.edi_payroll_consolidated_enable
+                not settings.edi_payroll_enable
+                or not settings.edi_payroll_consolidated_enable
             ):
                 continue
             # This line ensures that the electronic fields of the payroll are 
             # updated in Odoo, before the request
-            payload = json.dumps(rec.get_json_request(), indent=2, sort_keys=False)
-            rec._status_zip(payload)
+            rec._status_zip(rec.get_json_request())
 
     def refund_sheet(self):
         """
-        Creates a refund payslip based on the current payslip.
+        Creates a refund payslip for every Edi payslip of the recordset.
 
-        This function creates a refund payslip by copying the current payslip
-        and setting the 'credit_note' field to True. It also updates the name,
-        origin_payslip_id, and number fields of the refund payslip.
-        The refund payslip is then marked as 'done' by calling the
-        'action_payslip_done' method.
+        This function creates the refund payslips by copying the Edi payslips
+        as a batch and setting the 'credit_note' field to True. It also updates
+        the name, origin_payslip_id, and number fields of the refund payslips.
+        The refund payslips are then marked as 'done' together, so their
+        numbers are reserved as a block.
 
-        If the current payslip has an 'edi_payload' field and the refund
-        payslip does not have an 'edi_payload' field, the function generates
-        the JSON request payload for the refund payslip and writes it to the
-        'edi_payload' field.
+        If an Edi payslip has an 'edi_payload' field and its refund
+        payslip does not have an 'edi_payload' field, the delete request of the
+        refund payslip is built from the payload of the origin and written to the
+        'edi_payload' field. Only when the payload of the origin can't be used,
+        the JSON request payloads are generated again as a batch.
 
         The function returns an action window dictionary that specifies
-        the parameters for opening a window displaying the refund payslip.
+        the parameters for opening a window displaying all the refund payslips.
         The 'name' field specifies the title of the window. The 'view_mode'
         field specifies the display mode of the window as 'tree, form'.
         The 'view_id' field is set to False. The 'view_type' field specifies
@@ -558,36 +651,53 @@ class HrPayslipEdi(models.Model):
         Returns:
         - An action window dictionary.
         """
-        refund_payslip = None
-        for payslip in self:
-            if payslip.credit_note:
-                raise UserError(
-                    _("A adjustment note should not be made to a adjustment note")
-                )
-            refund_payslip = payslip.copy(
+        if any(self.mapped("credit_note")):
+            raise UserError(
+                _("A adjustment note should not be made to a adjustment note")
+            )
+        # All the adjustment notes are copied and numbered as a batch
+        refund_payslips = self._copy_multi(
+            [
                 {
                     "credit_note": True,
                     "name": _("Refund: ") + payslip.name,
                     "origin_payslip_id": payslip.id,
                     "number": _("New"),
                 }
+                for payslip in self
+            ]
+        )
+        refund_payslips.with_context(
+            without_compute_sheet=True
+        ).action_payslip_done()
+        # The missing payloads are built from the payloads of the origins,
+        # and only computed again when the origin payload can't be used
+        without_payload = refund_payslips.filtered(
+            lambda refund: refund.origin_payslip_id.edi_payload
+            and not refund.edi_payload
+        )
+        to_compute = self.browse()
+        for refund_payslip in without_payload:
+            payload = refund_payslip._get_json_delete_request_from_origin()
+            if payload is None:
+                to_compute |= refund_payslip
+                continue
+            refund_payslip.write(
+                {"edi_payload": refund_payslip._encode_edi_payload(payload)}
             )
-            refund_payslip.with_context(
-                without_compute_sheet=True
-            ).action_payslip_done()
-            if payslip.edi_payload and not refund_payslip.edi_payload:
-                payload = refund_payslip.get_json_request()
-                refund_payslip.write(
-                    {"edi_payload": json.dumps(payload, indent=2, sort_keys=False)}
-                )
+        json_requests = to_compute._prepare_json_requests()
+        for refund_payslip in to_compute:
+            payload, vals = json_requests[refund_payslip.id]
+            vals["edi_payload"] = refund_payslip._encode_edi_payload(payload)
+            refund_payslip.write(vals)
         formview_ref = self.env.ref(
             "payroll_dataico.view_hr_payslip_edi_form", False
         )
         treeview_ref = self.env.ref(
             "payroll_dataico.view_hr_payslip_edi_tree", False
         )
-        if refund_payslip is not None:
-            domain = "[('id', 'in', %s)]" % refund_payslip.ids
+        if refund_payslips:
+            domain = "[('id', 'in', %s)]" % refund_payslips.ids
         else:
             domain = "[(credit_note, '=', True)]"
         return {
@@ -621,12 +731,192 @@ class HrPayslipEdi(models.Model):
         - rec: The record being processed
         """
         for rec in self:
+            settings = rec.company_id._get_payroll_settings()
             if (
-                not rec.company_id.edi_payroll_enable
-                or not rec.company_id.edi_payroll_consolidated_enable
+                not settings.edi_payroll_enable
+                or not settings.edi_payroll_consolidated_enable
             ):
                 continue
             # This line ensures that the electronic fields of the payroll are 
             # updated in Odoo, before the request
             payload = rec.get_json_request()
             rec._status_document_log(payload)
+
+    @api.model
+    def _get_pdf_export_directory(self):
+        """
+        Returns the directory of the zip files of the PDF exports of the database,
+        inside the data directory of the server.
+        """
+        directory = os.path.join(
+            tools.config["data_dir"], "payroll_dataico_exports", self.env.cr.dbname
+        )
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    @api.model
+    def _get_pdf_export_path(self, token):
+        """
+        Returns the path of the zip file of the PDF export with the given token,
+        or None if the token is not valid or the file does not exist.
+        """
+        if not token or not PDF_EXPORT_TOKEN.match(token):
+            return None
+        path = os.path.join(self._get_pdf_export_directory(), token + ".zip")
+        return path if os.path.isfile(path) else None
+
+    @api.model
+    def _clean_pdf_exports(self):
+        """
+        Removes the zip files of the PDF exports older than PDF_EXPORT_MAX_AGE.
+        """
+        directory = self._get_pdf_export_directory()
+        limit = time.time() - PDF_EXPORT_MAX_AGE
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < limit:
+                    os.remove(path)
+            except OSError as e:
+                _logger.debug("The export %s could not be removed: %s", path, e)
+
+    def _get_pdf_export_workers(self):
+        """
+        Returns the number of threads used to render the PDF exports, read from
+        the system parameter 'jorels.payroll.pdf_export_workers'.
+        Every thread runs its own wkhtmltopdf process, with its own cursor.
+        """
+        try:
+            return max(
+                1,
+                int(
+                    self.env["ir.config_parameter"]
+                    .sudo()
+                    .get_param("jorels.payroll.pdf_export_workers", 2)
+                ),
+            )
+        except ValueError as e:
+            raise UserError(
+                "The system parameter 'jorels.payroll.pdf_export_workers' is misconfigured. Use only integers"
+            )
+
+    def _render_pdf_chunk(self, report_ref):
+        """
+        Renders the PDF report of a chunk of the recordset in a single
+        wkhtmltopdf run, with a new cursor, so it can be called from a thread.
+
+        Returns:
+            list: Tuples (record id, PDF bytes). When the rendered document can't
+            be split by record, a single tuple with the id False is returned.
+        """
+        with self.env.registry.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            streams = env["ir.actions.report"]._render_qweb_pdf_prepare_streams(
+                report_ref, {}, res_ids=self.ids
+            )
+            res = []
+            for res_id, stream_data in streams.items():
+                stream = stream_data["stream"]
+                if stream is None:
+                    continue
+                res.append((res_id, stream.getvalue()))
+                stream.close()
+            return res
+
+    def export_pdf_zip(self, chunk_size=PDF_EXPORT_CHUNK_SIZE, progress=None):
+        """
+        Exports the PDF report of the Edi payslips of the recordset to a zip
+        file on disk.
+
+        The records are rendered in chunks of `chunk_size`, each one in a
+        single wkhtmltopdf run, by a pool of threads. Only a bounded number of
+        chunks is in memory at once, and every chunk is written to the zip as
+        soon as it is rendered, so the memory does not grow with the number of
+        payslips.
+
+        Args:
+            chunk_size (int): The number of records rendered by each run.
+            progress (callable): Called with the number of rendered records and
+            the total number of records after every chunk.
+
+        Returns:
+            str: The token of the export, used to download it.
+        """
+        self.check_access_rights("read")
+        self.check_access_rule("read")
+        self._clean_pdf_exports()
+        report_ref = "payroll_dataico.action_hr_payslip_edi_co_report"
+        names = {}
+        used_names = set()
+        for rec in self:
+            name = (rec.number or rec.name or str(rec.id)).replace("/", "_")
+            if name in used_names:
+                name = "%s_%s" % (name, rec.id)
+            used_names.add(name)
+            names[rec.id] = name + ".pdf"
+        chunks = [
+            self[index : index + chunk_size]
+            for index in range(0, len(self), chunk_size)
+        ]
+        workers = self._get_pdf_export_workers()
+        token = uuid.uuid4().hex
+        directory = self._get_pdf_export_directory()
+        path = os.path.join(directory, token + ".zip")
+        temp_path = path + ".part"
+        total = len(self)
+        done = 0
+
+        def write_chunk(archive, pending):
+            nonlocal done
+            chunk_index, chunk, future = pending.popleft()
+            for res_id, pdf in future.result():
+                if res_id:
+                    name = names[res_id]
+                else:
+                    name = "chunk_%s.pdf" % (chunk_index + 1)
+                archive.writestr(name, pdf)
+            done += len(chunk)
+            _logger.info("PDF export %s: %s/%s", token, done, total)
+            if progress:
+                progress(done, total)
+
+        # PDFs are already compressed
+        with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_STORED) as archive:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for chunk_index, chunk in enumerate(chunks):
+                    future = executor.submit(chunk._render_pdf_chunk, report_ref)
+                    pending.append((chunk_index, chunk, future))
+                    # At most two rendered chunks per thread are kept in memory
+                    if len(pending) >= 2 * workers:
+                        write_chunk(archive, pending)
+                while pending:
+                    write_chunk(archive, pending)
+        os.replace(temp_path, path)
+        return token
+
+    def action_export_pdf_zip(self):
+        """
+        Queues the export of the PDF report of the selected Edi payslips to a
+        zip file. The zip is built by a scheduled action, outside the request,
+        and the user is notified when it can be downloaded.
+        """
+        self.check_access_rights("read")
+        self.check_access_rule("read")
+        self.env["l10n_co_hr_payroll.pdf_export"].create(
+            {"payslip_edi_ids": [(6, 0, self.ids)]}
+        )
+        self.env.ref("payroll_dataico.ir_cron_pdf_exports").sudo()._trigger()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("PDF export"),
+                "message": _(
+                    "The PDF export of %s Edi payslips has been queued, you will "
+                    "be notified when it is ready."
+                )
+                % len(self),
+                "sticky": False,
+            },
+        }
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+#   l10n_co_hr_payroll
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+
+import base64
+import io
+from collections import OrderedDict
+
+from odoo import models
+
+from .edi import EDI_PDF_REPORTS
+
+
+class IrActionsReport(models.Model):
+    _inherit = "ir.actions.report"
+
+    def _render_qweb_pdf_prepare_streams(self, report_ref, data, res_ids=None):
+        """
+        The Edi payslips with the PDF stored from the DIAN response are not
+        rendered again, their stored PDF is used. Only the rest of the records
+        are rendered.
+        """
+        report = self._get_report(report_ref)
+        if not res_ids or report.model not in EDI_PDF_REPORTS:
+            return super()._render_qweb_pdf_prepare_streams(
+                report_ref, data, res_ids=res_ids
+            )
+        records = self.env[report.model].browse(res_ids)
+        if report != records._get_edi_pdf_report():
+            return super()._render_qweb_pdf_prepare_streams(
+                report_ref, data, res_ids=res_ids
+            )
+        stored_ids = records._get_stored_edi_pdf_ids()
+        if not stored_ids:
+            return super()._render_qweb_pdf_prepare_streams(
+                report_ref, data, res_ids=res_ids
+            )
+        to_render = [res_id for res_id in res_ids if res_id not in stored_ids]
+        rendered = {}
+        if to_render:
+            rendered = super()._render_qweb_pdf_prepare_streams(
+                report_ref, data, res_ids=to_render
+            )
+        collected_streams = OrderedDict()
+        for record in records:
+            if record.id in stored_ids:
+                collected_streams[record.id] = {
+                    "stream": io.BytesIO(base64.b64decode(record.edi_pdf_base64)),
+                    "attachment": None,
+                }
+            elif record.id in rendered:
+                collected_streams[record.id] = rendered[record.id]
+        # The rendered records that could not be split
+        if False in rendered:
+            collected_streams[False] = rendered[False]
+        return collected_streams
@@ -22,6 +22,7 @@
 
 # First import languages
 from . import languages
+from . import ranked_search
 
 # Then import others models
 from . import correction_concepts
@@ -22,7 +22,7 @@
 
 import logging
 
-from odoo import fields, models
+from odoo import api, fields, models, tools
 
 _logger = logging.getLogger(__name__)
 
@@ -34,3 +34,46 @@ class Languages(models.Model):
     # "id", "name", "code"
     name = fields.Char(string="Name", required=True, readonly=True)
     code = fields.Char(string="Code", required=False, readonly=True)
+
+    @api.model
+    @tools.ormcache("self.env.lang")
+    def _get_catalogue(self):
+        """
+        Returns the whole listing in the language of the context, loaded with
+        a single query the first time it is used by the registry and kept
+        until a listing changes.
+        The listings are static DIAN catalogues, so the names shown in the
+        rendered payloads are dictionary hits instead of queries. The payloads
+        use the ids of the records as the DIAN codes, so no lookup by code is
+        needed.
+
+        The result is shared by the whole process, so it must not be modified.
+
+        Returns:
+            dict: The 'names' of the records by id.
+        """
+        records = (
+            self.sudo()
+            .with_context(active_test=False)
+            .search_read([], ["name"], order="id")
+        )
+        return {"names": {record["id"]: record["name"] for record in records}}
+
+    # The listings are cached by the registry (see _get_catalogue), so the
+    # caches are cleared when they change. Clearing them is signalled to the
+    # other workers of the server by the registry.
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super(Languages, self).create(vals_list)
+        self.clear_caches()
+        return res
+
+    def write(self, vals):
+        res = super(Languages, self).write(vals)
+        self.clear_caches()
+        return res
+
+    def unlink(self):
+        res = super(Languages, self).unlink()
+        self.clear_caches()
+        return res
@@ -29,9 +29,10 @@ _logger = logging.getLogger(__name__)
 
 class Municipalities(models.Model):
     _name = "l10n_co_edi_jorels.municipalities"
-    _inherit = "l10n_co_edi_jorels.languages"
+    _inherit = ["l10n_co_edi_jorels.languages", "l10n_co_edi_jorels.ranked_search"]
     _description = "Municipalities"
     _order = "name"
+    _ranked_search_fields = ["name", "code"]
 
     department_id = fields.Many2one(comodel_name='l10n_co_edi_jorels.departments', string="Department", required=True,
                                     readonly=True, index=True, ondelete='RESTRICT')
@@ -22,14 +22,16 @@
 
 import logging
 
-from odoo import fields, models, api
+from odoo import fields, models
 
 _logger = logging.getLogger(__name__)
 
 
 class Postal(models.Model):
     _name = "l10n_co_edi_jorels.postal"
+    _inherit = "l10n_co_edi_jorels.ranked_search"
     _description = "Postal"
+    _ranked_search_fields = ["name", "neighborhood", "postal_zone"]
 
     name = fields.Char(string="Postal code", required=True)
     postal_zone = fields.Char(string="Postal zone", required=True)
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+#
+# Jorels S.A.S. - Copyright (2019-2023)
+#
+# This file is part of l10n_co_edi_jorels.
+#
+# l10n_co_edi_jorels is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# l10n_co_edi_jorels is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with l10n_co_edi_jorels.  If not, see <https://www.gnu.org/licenses/>.
+#
+# email: info@jorels.com
+#
+
+import logging
+
+import psycopg2
+from odoo import api, models, tools
+from odoo.tools.sql import create_index, escape_psql
+
+_logger = logging.getLogger(__name__)
+
+
+class RankedSearch(models.AbstractModel):
+    _name = "l10n_co_edi_jorels.ranked_search"
+    _description = "Ranked name search"
+
+    # Columns matched by the name search, the first one is the displayed name
+    _ranked_search_fields = ["name"]
+    # Maximum number of results of the name search
+    _ranked_search_limit = 100
+
+    def init(self):
+        """
+        Creates the trigram indexes of the columns of the name search when
+        the pg_trgm extension is available. Without it the columns are scanned,
+        as with the default name search.
+        """
+        if self._abstract or not self._create_trigram_extension():
+            return
+        for field_name in self._ranked_search_fields:
+            create_index(
+                self.env.cr,
+                "%s_%s_trgm_index" % (self._table, field_name),
+                self._table,
+                ['"%s" gin_trgm_ops' % field_name],
+                "gin",
+            )
+
+    @api.model
+    def _create_trigram_extension(self):
+        """
+        Creates the pg_trgm extension if the database user is allowed to.
+
+        Returns:
+            bool: True if the extension is available.
+        """
+        cr = self.env.cr
+        try:
+            with cr.savepoint(flush=False):
+                cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except psycopg2.Error as e:
+            _logger.info("The extension pg_trgm could not be created: %s", e)
+        return self._has_trigram()
+
+    @api.model
+    @tools.ormcache()
+    def _has_trigram(self):
+        self.env.cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return bool(self.env.cr.fetchone())
+
+    @api.model
+    def _name_search(
+        self, name, args=None, operator="ilike", limit=100, name_get_uid=None
+    ):
+        """
+        Searches the name with a single query on the indexed columns of
+        _ranked_search_fields, ranked by match quality: the exact names
+        first, then the names that start with it, then the other columns
+        that start with it, and then the rest of the matches. The number of
+        results is capped by _ranked_search_limit.
+
+        The name is matched anywhere in the columns, like the default name
+        search. With the pg_trgm extension the matches are found through the
+        trigram indexes and the rest of the matches are ranked by similarity.
+        """
+        term = (name or "").strip()
+        if not term or operator != "ilike":
+            return super()._name_search(
+                name,
+                args=args,
+                operator=operator,
+                limit=limit,
+                name_get_uid=name_get_uid,
+            )
+        model = self.with_user(name_get_uid) if name_get_uid else self
+        model.check_access_rights("read")
+        domain = args or []
+        model._flush_search(domain, fields=list(self._ranked_search_fields))
+        query = model._where_calc(domain)
+        model._apply_ir_rules(query, "read")
+        columns = [
+            '"%s"."%s"' % (self._table, field_name)
+            for field_name in self._ranked_search_fields
+        ]
+        pattern = "%%%s%%" % escape_psql(term)
+        condition = " OR ".join("%s ILIKE %%s" % column for column in columns)
+        query.add_where("(%s)" % condition, [pattern] * len(columns))
+
+        prefix = "%s%%" % escape_psql(term)
+        rank = "CASE WHEN lower(%s) = lower(%%s) THEN 0 WHEN %s ILIKE %%s THEN 1" % (
+            columns[0],
+            columns[0],
+        )
+        rank_params = [term, prefix]
+        if len(columns) > 1:
+            rank += " WHEN %s THEN 2" % " OR ".join(
+                "%s ILIKE %%s" % column for column in columns[1:]
+            )
+            rank_params += [prefix] * (len(columns) - 1)
+        rank += " ELSE 3 END"
+        order = [rank]
+        if self._has_trigram():
+            order.append("similarity(%s, %%s) DESC" % columns[0])
+            rank_params.append(term)
+        order += [columns[0], '"%s".id' % self._table]
+
+        limit = min(limit or self._ranked_search_limit, self._ranked_search_limit)
+        from_clause, where_clause, params = query.get_sql()
+        self.env.cr.execute(
+            'SELECT "%s".id FROM %s WHERE %s ORDER BY %s LIMIT %%s'
+            % (self._table, from_clause, where_clause, ", ".join(order)),
+            params + rank_params + [limit],
+        )
+        return [row[0] for row in self.env.cr.fetchall()]
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+import datetime as dt
+import logging
+
+from odoo import api, fields, models, _
+
+from .hr_payslip_edi import PDF_EXPORT_MAX_AGE
+
+_logger = logging.getLogger(__name__)
+
+
+class PdfExport(models.Model):
+    _name = "l10n_co_hr_payroll.pdf_export"
+    _description = "PDF export of Edi payslips"
+    _order = "id desc"
+
+    user_id = fields.Many2one(
+        "res.users",
+        string="User",
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.user,
+    )
+    company_id = fields.Many2one(
+        "res.company",
+        string="Company",
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.company,
+    )
+    payslip_edi_ids = fields.Many2many(
+        "hr.payslip.edi", string="Edi Payslips", readonly=True
+    )
+    payslip_count = fields.Integer(
+        "Payslips", compute="_compute_payslip_count", store=True
+    )
+    progress = fields.Integer(
+        "Rendered", readonly=True, copy=False, help="Number of rendered payslips"
+    )
+    state = fields.Selection(
+        [("pending", "Pending"), ("done", "Done"), ("failed", "Failed")],
+        string="State",
+        required=True,
+        readonly=True,
+        default="pending",
+    )
+    token = fields.Char(readonly=True, copy=False)
+    error = fields.Text(readonly=True, copy=False)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        # The exports are always rendered and downloaded by the user that
+        # requests them, in one of its allowed companies
+        for vals in vals_list:
+            vals["user_id"] = self.env.uid
+            if vals.get("company_id") not in self.env.companies.ids:
+                vals["company_id"] = self.env.company.id
+        return super(PdfExport, self).create(vals_list)
+
+    @api.depends("payslip_edi_ids")
+    def _compute_payslip_count(self):
+        for rec in self:
+            rec.payslip_count = len(rec.payslip_edi_ids)
+
+    @api.model
+    def _cron_process_pdf_exports(self):
+        """
+        Builds the zip files of the pending PDF exports, one by one, with the
+        user and the company that requested them, and notifies the users.
+        The exports older than PDF_EXPORT_MAX_AGE, whose files are already
+        removed, are deleted.
+        """
+        self.env["hr.payslip.edi"]._clean_pdf_exports()
+        limit = fields.Datetime.now() - dt.timedelta(seconds=PDF_EXPORT_MAX_AGE)
+        self.search(
+            [("state", "!=", "pending"), ("create_date", "<", limit)]
+        ).unlink()
+        self.env.cr.commit()
+        for export in self.search([("state", "=", "pending")], order="id"):
+            export._process()
+
+    def _process(self):
+        """
+        Builds the zip file of the export and commits the result, so every
+        export is independent of the others. The number of rendered payslips
+        is committed after every chunk, so the users can follow the export.
+        """
+        self.ensure_one()
+        payslips = self.payslip_edi_ids.with_user(self.user_id).with_company(
+            self.company_id
+        )
+
+        def update_progress(done, total):
+            # The export doesn't write anything else, only the progress is
+            # committed here
+            self.write({"progress": done})
+            self.env.cr.commit()
+
+        try:
+            token = payslips.export_pdf_zip(progress=update_progress)
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.exception("PDF export %s failed", self.id)
+            self.write({"state": "failed", "error": str(e)})
+            self._notify_user(
+                _("The PDF export of %s Edi payslips failed: %s")
+                % (self.payslip_count, e),
+                "danger",
+            )
+        else:
+            self.write({"state": "done", "token": token})
+            self._notify_user(
+                _(
+                    "The PDF export of %s Edi payslips is ready, download it "
+                    "from the PDF Exports menu."
+                )
+                % self.payslip_count,
+                "success",
+            )
+        self.env.cr.commit()
+
+    def _notify_user(self, message, notification_type):
+        self.env["bus.bus"]._sendone(
+            self.user_id.partner_id,
+            "simple_notification",
+            {
+                "title": _("PDF export"),
+                "message": message,
+                "type": notification_type,
+                "sticky": True,
+            },
+        )
+
+    def action_download(self):
+        """
+        Returns the action to download the zip file of the export.
+        """
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_url",
+            "target": "self",
+            "url": "/payroll_dataico/pdf_export/%s" % self.token,
+        }
@@ -19,7 +19,30 @@
 #   email: info@jorels.com
 #
 
-from odoo import fields, models, api
+from collections import namedtuple
+
+from odoo import fields, models, tools
+
+# Fields of the company read by the payroll and EDI hot paths
+PAYROLL_SETTINGS_FIELDS = frozenset(
+    [
+        "api_key",
+        "edi_payroll_always_validate",
+        "edi_payroll_consolidated_enable",
+        "edi_payroll_enable",
+        "edi_payroll_enable_validate_state",
+        "edi_payroll_id",
+        "edi_payroll_is_not_test",
+        "edi_payroll_pin",
+        "edi_payroll_test_set_id",
+    ]
+)
+
+# Immutable snapshot of the payroll settings of a company,
+# with the system parameters 'api_url' and 'recompute_sheet'
+PayrollSettings = namedtuple(
+    "PayrollSettings", sorted(PAYROLL_SETTINGS_FIELDS) + ["api_url", "recompute_sheet"]
+)
 
 
 class ResCompany(models.Model):
@@ -77,4 +100,36 @@ class ResCompany(models.Model):
     )
     edi_payroll_enable_validate_state = fields.Boolean(
         string="Enable intermediate 'DIAN Validation' state for payroll", default=False
-    )
\ No newline at end of file
+    )
+
+    @tools.ormcache("self.id")
+    def _get_payroll_settings(self):
+        """
+        Returns the payroll settings of the company, read once and kept until
+        the company or a system parameter changes, so the batch loops of the
+        payroll read attributes instead of fields and parameters.
+
+        The system parameters 'jorels.edipo.api_url' and
+        'jorels.payroll.recompute_sheet' are global, the same for all the
+        companies. The latter is kept as it is stored, it is only parsed
+        where it is used, so a misconfigured value does not break the other
+        users of the snapshot.
+
+        Returns:
+            PayrollSettings: The snapshot of the settings.
+        """
+        self.ensure_one()
+        company = self.sudo()
+        params = self.env["ir.config_parameter"].sudo()
+        return PayrollSettings(
+            api_url=params.get_param("jorels.edipo.api_url", "https://edipo.jorels.com"),
+            recompute_sheet=params.get_param("jorels.payroll.recompute_sheet", "1"),
+            **{name: company[name] for name in PAYROLL_SETTINGS_FIELDS}
+        )
+
+    def write(self, vals):
+        res = super(ResCompany, self).write(vals)
+        # The system parameters clear the caches by themselves
+        if PAYROLL_SETTINGS_FIELDS.intersection(vals):
+            self.clear_caches()
+        return res
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+
+
+import datetime as dt
+import functools
+from array import array
+
+# Holidays that are always on their date
+FIXED_HOLIDAYS = [(1, 1), (5, 1), (7, 20), (8, 7), (12, 8), (12, 25)]
+
+# Holidays moved to the next Monday (Ley 51 de 1983)
+MOVED_HOLIDAYS = [(1, 6), (3, 19), (6, 29), (8, 15), (10, 12), (11, 1), (11, 11)]
+
+# Days after Easter Sunday of the holidays that depend on it, and whether
+# they are moved to the next Monday
+EASTER_HOLIDAYS = [(-3, False), (-2, False), (39, True), (60, True), (68, True)]
+
+
+def easter(year):
+    """
+    Returns the date of Easter Sunday of a year, with the anonymous
+    Gregorian algorithm.
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return dt.date(year, month, day + 1)
+
+
+def next_monday(date):
+    """
+    Returns the date, if it is a Monday, or the next Monday.
+    """
+    return date + dt.timedelta(days=(7 - date.weekday()) % 7)
+
+
+@functools.lru_cache(maxsize=None)
+def holidays(year):
+    """
+    Returns the Colombian holidays of a year.
+
+    Returns:
+        frozenset: The dates of the holidays.
+    """
+    dates = {dt.date(year, month, day) for month, day in FIXED_HOLIDAYS}
+    dates.update(
+        next_monday(dt.date(year, month, day)) for month, day in MOVED_HOLIDAYS
+    )
+    easter_sunday = easter(year)
+    for days, moved in EASTER_HOLIDAYS:
+        date = easter_sunday + dt.timedelta(days=days)
+        dates.add(next_monday(date) if moved else date)
+    return frozenset(dates)
+
+
+# Years covered by the index, the dates out of it are computed on demand
+FIRST_YEAR = 1990
+LAST_YEAR = 2100
+
+# Flags of the days in DAY_FLAGS
+SUNDAY = 1
+HOLIDAY = 2
+
+_FIRST_ORDINAL = dt.date(FIRST_YEAR, 1, 1).toordinal()
+_LAST_ORDINAL = dt.date(LAST_YEAR, 12, 31).toordinal()
+
+
+def _build_month_lengths():
+    lengths = bytearray()
+    for year in range(FIRST_YEAR, LAST_YEAR + 1):
+        for month in range(1, 13):
+            following = dt.date(year + month // 12, month % 12 + 1, 1)
+            lengths.append((following - dt.timedelta(days=1)).day)
+    return bytes(lengths)
+
+
+def _build_day_flags():
+    flags = bytearray(_LAST_ORDINAL - _FIRST_ORDINAL + 1)
+    # The first Sunday of the index, ordinal 7 is a Sunday
+    first_sunday = _FIRST_ORDINAL + (7 - _FIRST_ORDINAL % 7) % 7
+    for ordinal in range(first_sunday, _LAST_ORDINAL + 1, 7):
+        flags[ordinal - _FIRST_ORDINAL] = SUNDAY
+    for year in range(FIRST_YEAR, LAST_YEAR + 1):
+        for date in holidays(year):
+            flags[date.toordinal() - _FIRST_ORDINAL] |= HOLIDAY
+    return bytes(flags)
+
+
+# Length of every month, by (year - FIRST_YEAR) * 12 + month - 1
+MONTH_LENGTHS = _build_month_lengths()
+
+# SUNDAY and HOLIDAY flags of every day, by ordinal from January 1 of FIRST_YEAR
+DAY_FLAGS = _build_day_flags()
+
+
+def month_length(year, month):
+    """
+    Returns the number of days of a month.
+    """
+    if FIRST_YEAR <= year <= LAST_YEAR:
+        return MONTH_LENGTHS[(year - FIRST_YEAR) * 12 + month - 1]
+    following = dt.date(year + month // 12, month % 12 + 1, 1)
+    return (following - dt.timedelta(days=1)).day
+
+
+def day_flags(date):
+    """
+    Returns the SUNDAY and HOLIDAY flags of a date.
+    """
+    ordinal = date.toordinal()
+    if _FIRST_ORDINAL <= ordinal <= _LAST_ORDINAL:
+        return DAY_FLAGS[ordinal - _FIRST_ORDINAL]
+    return (SUNDAY if ordinal % 7 == 0 else 0) | (
+        HOLIDAY if date in holidays(date.year) else 0
+    )
+
+
+def is_holiday(date):
+    """
+    Returns True if the date is a Colombian holiday.
+    """
+    return bool(day_flags(date) & HOLIDAY)
+
+
+def is_rest_day(date):
+    """
+    Returns True if the date is a Sunday or a Colombian holiday, the days
+    whose work has the Sunday and holiday surcharges.
+    """
+    return bool(day_flags(date))
+
+
+def rest_days(start, end):
+    """
+    Returns the Sundays and holidays between two dates, both included.
+
+    Returns:
+        list: The dates of the rest days.
+    """
+    return [
+        start + dt.timedelta(days=offset)
+        for offset in range((end - start).days + 1)
+        if day_flags(start + dt.timedelta(days=offset))
+    ]
+
+
+def _day_360(date):
+    # The last day of every month is the day 30 in the 360 days convention
+    if date.day == month_length(date.year, date.month):
+        return 30
+    return date.day
+
+
+def _ordinal_360(date):
+    return date.year * 360 + (date.month - 1) * 30 + _day_360(date)
+
+
+# Day of every date in the 360 days convention, counted from the year 0,
+# by ordinal from January 1 of FIRST_YEAR
+DAYS_360 = array(
+    "l",
+    (
+        _ordinal_360(dt.date.fromordinal(ordinal))
+        for ordinal in range(_FIRST_ORDINAL, _LAST_ORDINAL + 1)
+    ),
+)
+
+
+def days_360(start, end):
+    """
+    Returns the number of days between two dates, both included, with the
+    360 days convention of the payroll: months of 30 days.
+    """
+    return _ordinal_360(end) - _ordinal_360(start) + 1
+
+
+def days_360_many(starts, ends):
+    """
+    Returns the `days_360` of every pair of dates of two sequences, with a
+    lookup in the DAYS_360 table for the dates of the index.
+
+    Returns:
+        list: The number of days of every pair.
+    """
+    table = DAYS_360
+    first = _FIRST_ORDINAL
+    size = len(table)
+    result = []
+    for start, end in zip(starts, ends):
+        start_index = start.toordinal() - first
+        end_index = end.toordinal() - first
+        if 0 <= start_index < size and 0 <= end_index < size:
+            result.append(table[end_index] - table[start_index] + 1)
+        else:
+            result.append(days_360(start, end))
+    return result
+
+
+def subtract_absences(days, absences):
+    """
+    Returns the days less the quantities of the absences, never negative.
+
+    The days are truncated to an integer after every subtraction, like the
+    integer field of the worked days of the payslip, so fractional quantities
+    give the same result as subtracting them one by one from the field.
+    """
+    for quantity in absences:
+        days = int(days - quantity)
+    return max(days, 0)
+
+
+def worked_days(start, end, absences=()):
+    """
+    Returns the worked days between two dates, both included, with the 360
+    days convention, less the quantities of the absences, in order.
+    """
+    return subtract_absences(days_360(start, end), absences)
+
+
+def worked_days_many(starts, ends, absences):
+    """
+    Returns the `worked_days` of every item of three sequences, the last one
+    with the sequence of absence quantities of every item.
+
+    Returns:
+        list: The worked days of every item.
+    """
+    return [
+        subtract_absences(days, quantities)
+        for days, quantities in zip(days_360_many(starts, ends), absences)
+    ]
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+
+import datetime as dt
+
+from . import co_calendar
+
+# Category of the hours by (overtime, night, Sunday or holiday).
+# The ordinary daytime hours of working days are paid by the basic salary.
+CATEGORIES = {
+    (False, False, False): None,
+    (False, True, False): "hours_night_surcharge",
+    (False, False, True): "daily_surcharge_hours_sundays_holidays",
+    (False, True, True): "sunday_holidays_night_surcharge_hours",
+    (True, False, False): "daily_overtime",
+    (True, True, False): "overtime_night_hours",
+    (True, False, True): "sunday_holiday_daily_overtime",
+    (True, True, True): "sunday_night_overtime_holidays",
+}
+
+# The overtime hours are paid with their surcharge, the rest only with it
+OVERTIME_PAID_CATEGORIES = frozenset(
+    category for (overtime, _night, _rest), category in CATEGORIES.items() if overtime
+)
+
+# Night work is between 19:00 and 6:00 (Ley 2466 de 2025)
+NIGHT_START = 19.0
+NIGHT_END = 6.0
+
+# Ordinary hours per day, the rest are overtime
+DAILY_HOURS = 8.0
+
+
+def _at_hours(date, hours):
+    return dt.datetime.combine(date, dt.time()) + dt.timedelta(hours=hours)
+
+
+def classify(
+    intervals,
+    night_start=NIGHT_START,
+    night_end=NIGHT_END,
+    daily_hours=DAILY_HOURS,
+    is_rest_day=co_calendar.is_rest_day,
+):
+    """
+    Splits work intervals into segments of the overtime and surcharge categories.
+
+    The ordinary hours of a day are counted from the first interval that
+    starts that day, and the hours after `daily_hours` are overtime. The night
+    hours are between `night_start` and `night_end`, and the Sundays and
+    holidays are given by `is_rest_day`, per calendar day. The segments of the
+    ordinary daytime hours of working days are not returned.
+
+    Args:
+        intervals (iterable): Tuples (key, start, end) with the datetimes of
+        the intervals, sorted by key and start. The key identifies the
+        worker, as the id of a payslip.
+
+    Yields:
+        tuple: (key, category, start, end) of every segment, with the
+        adjacent segments of the same category merged.
+    """
+    worked = {}
+    current = None
+    for key, start, end in intervals:
+        if end <= start:
+            continue
+        # Hours already worked by the worker on the day the interval starts
+        day_key = (key, start.date())
+        ordinary_left = max(daily_hours - worked.get(day_key, 0.0), 0.0)
+        worked[day_key] = worked.get(day_key, 0.0) + (
+            (end - start).total_seconds() / 3600.0
+        )
+        overtime_start = start + dt.timedelta(hours=ordinary_left)
+        # The points where the category can change
+        cuts = {start, end}
+        if start < overtime_start < end:
+            cuts.add(overtime_start)
+        date = start.date()
+        while True:
+            for hours in (0.0, night_end, night_start):
+                point = _at_hours(date, hours)
+                if start < point < end:
+                    cuts.add(point)
+            date += dt.timedelta(days=1)
+            if _at_hours(date, 0.0) >= end:
+                break
+        cuts = sorted(cuts)
+        for segment_start, segment_end in zip(cuts, cuts[1:]):
+            middle = segment_start + (segment_end - segment_start) / 2
+            hour = middle.hour + middle.minute / 60.0 + middle.second / 3600.0
+            if night_start > night_end:
+                night = hour >= night_start or hour < night_end
+            else:
+                night = night_start <= hour < night_end
+            category = CATEGORIES[
+                (middle >= overtime_start, night, is_rest_day(middle.date()))
+            ]
+            if current and current[:2] == (key, category) and current[3] == segment_start:
+                current = (key, category, current[2], segment_end)
+                continue
+            if current and current[1]:
+                yield current
+            current = (key, category, segment_start, segment_end)
+    if current and current[1]:
+        yield current
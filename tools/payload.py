@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+
+import datetime as dt
+from copy import deepcopy
+
+from . import payload_codec
+
+
+def dict_root_sum(first, last, vals):
+    """
+    Adds the values of the given fields of 'first' to the ones of 'last'.
+    If a field does not exist in 'last', it is copied from 'first'.
+    """
+    for field in vals:
+        if field in first:
+            if field not in last:
+                last[field] = first[field]
+            else:
+                last[field] += first[field]
+
+
+def dict_root_merge(first, last, vals):
+    """
+    Replaces the values of the given fields of 'last' with the ones of 'first'.
+    """
+    for field in vals:
+        if field in first:
+            last[field] = first[field]
+
+
+def dict_root_append_lists(first, last, list_fields):
+    """
+    Appends the lists of the given fields of 'first' to the ones of 'last'.
+    """
+    for list_field in list_fields:
+        if list_field in first:
+            if list_field not in last:
+                last[list_field] = []
+            last[list_field].extend(first[list_field])
+
+
+def dict_root_append_dicts(first, last, dict_fields):
+    """
+    Appends the lists of every key of the given dictionary fields
+    of 'first' to the ones of 'last'.
+    """
+    for dict_field in dict_fields:
+        if dict_field in first:
+            if dict_field not in last:
+                last[dict_field] = {}
+            dict_root_append_lists(
+                first[dict_field], last[dict_field], first[dict_field]
+            )
+
+
+def dict_append_lists_1(first, last, b, c):
+    """
+    Appends the lists of the fields 'c' of the 'b' key of 'first'
+    to the ones of 'last'.
+    """
+    if b in first:
+        if b not in last:
+            last[b] = {}
+        dict_root_append_lists(first[b], last[b], c)
+
+
+def dict_sum_1(first, last, b, c, d=()):
+    """
+    Adds the fields 'c' and merges the fields 'd' of the 'b' key of 'first'
+    into the ones of 'last'.
+    """
+    if b in first:
+        if b not in last:
+            last[b] = {}
+        dict_root_sum(first[b], last[b], c)
+        dict_root_merge(first[b], last[b], d)
+
+
+def dict_sum_2(first, last, a, b, c, d=()):
+    """
+    Adds the fields 'c' and merges the fields 'd' of the 'b' key inside
+    the 'a' key of 'first' into the ones of 'last'.
+    """
+    if a in first:
+        if a not in last:
+            last[a] = {}
+        if b in first[a]:
+            if b not in last[a]:
+                last[a][b] = {}
+            dict_root_sum(first[a][b], last[a][b], c)
+            dict_root_merge(first[a][b], last[a][b], d)
+
+
+def join_dicts(a, b, date_issue):
+    """
+    Merges two payroll payloads, preserving the order of the periods.
+
+    Args:
+        a (dict): The first payroll payload.
+        b (dict): The second payroll payload.
+        date_issue (str): The issue date for the merged payload.
+
+    Returns:
+        dict: The merged payroll payload.
+    """
+    # Determine the order of the dictionaries based on the 'settlement_start_date' key
+    if dt.datetime.strptime(
+        a["period"]["settlement_start_date"], "%Y-%m-%d"
+    ) < dt.datetime.strptime(b["period"]["settlement_start_date"], "%Y-%m-%d"):
+        first, last = deepcopy(a), deepcopy(b)
+    else:
+        first, last = deepcopy(b), deepcopy(a)
+    # Root level keys
+    dict_root_sum(first, last, ["accrued_total", "deductions_total", "total"])
+    dict_root_append_lists(first, last, ["notes", "payment_dates"])
+    # Sequence key
+    if "sequence" in last:
+        last.pop("sequence")
+    # Period key
+    dict_root_merge(
+        first["period"], last["period"], ["admission_date", "settlement_start_date"]
+    )
+    last["period"]["date_issue"] = date_issue
+    # Earn key
+    dict_root_sum(
+        first["earn"],
+        last["earn"],
+        [
+            "endowment",
+            "sustainment_support",
+            "telecommuting",
+            "company_withdrawal_bonus",
+            "compensation",
+            "refund",
+        ],
+    )
+    dict_sum_2(first, last, "earn", "basic", ["worked_days", "worker_salary"])
+    dict_sum_2(
+        first, last, "earn", "primas", ["quantity", "payment", "non_salary_payment"]
+    )
+    dict_sum_2(
+        first, last, "earn", "layoffs", ["payment", "interest_payment"], ["percentage"]
+    )
+    dict_root_append_dicts(first["earn"], last["earn"], ["vacation", "licensings"])
+    dict_root_append_lists(
+        first["earn"],
+        last["earn"],
+        [
+            "transports",
+            "overtimes_surcharges",
+            "incapacities",
+            "bonuses",
+            "assistances",
+            "legal_strikes",
+            "other_concepts",
+            "compensations",
+            "vouchers",
+            "commissions",
+            "third_party_payments",
+            "advances",
+        ],
+    )
+    # Deduction key
+    dict_sum_1(
+        first,
+        last,
+        "deduction",
+        [
+            "voluntary_pension",
+            "withholding_source",
+            "afc",
+            "cooperative",
+            "tax_lien",
+            "complementary_plans",
+            "education",
+            "refund",
+            "debt",
+        ],
+    )
+    dict_sum_2(first, last, "deduction", "health", ["payment"], ["percentage"])
+    dict_sum_2(first, last, "deduction", "pension_fund", ["payment"], ["percentage"])
+    dict_sum_2(
+        first,
+        last,
+        "deduction",
+        "pension_security_fund",
+        ["payment", "payment_subsistence"],
+        ["percentage", "percentage_subsistence"],
+    )
+    dict_append_lists_1(
+        first,
+        last,
+        "deduction",
+        [
+            "trade_unions",
+            "sanctions",
+            "libranzas",
+            "third_party_payments",
+            "advances",
+            "other_deductions",
+        ],
+    )
+    return last
+
+
+def consolidate_payloads(payloads, date_issue):
+    """
+    Consolidates the payloads of the payslips of an Edi payslip.
+
+    Args:
+        payloads (list): The stored payloads of the payslips, in order.
+        date_issue (str): The issue date of the Edi payslip.
+
+    Returns:
+        dict: The consolidated payload.
+    """
+    json_request = {}
+    for index, payload in enumerate(payloads):
+        if index > 0:
+            json_request = join_dicts(
+                json_request, payload_codec.loads_stored(payload), date_issue
+            )
+        else:
+            json_request = payload_codec.loads_stored(payload)
+    return json_request
+
+
+def consolidate_payloads_batch(batch):
+    """
+    Consolidates a batch of Edi payslips in a single pass. It only receives
+    and returns plain data, so it doesn't touch the ORM.
+
+    Args:
+        batch (list): A list of tuples (edi_payslip_id, payloads, date_issue).
+
+    Returns:
+        list: A list of tuples (edi_payslip_id, consolidated payload).
+    """
+    return [
+        (edi_id, consolidate_payloads(payloads, date_issue))
+        for edi_id, payloads, date_issue in batch
+    ]
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+
+import base64
+import json
+import re
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Prefix of the compressed payloads. A JSON object never starts with it.
+COMPRESSED_PREFIX = "zlib:"
+
+
+def json_dumps(payload):
+    """
+    Serializes a payload in its compact canonical form with the standard library:
+    no whitespace between tokens and non ASCII characters kept as they are.
+    The order of the keys is preserved, because it is the order of display.
+    """
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def json_loads(text):
+    """
+    Deserializes a payload with the standard library.
+    """
+    return json.loads(text)
+
+
+# orjson formats some floats differently from the standard library: the
+# exponents without sign and padding ('1e16' for '1e+16') and the values from
+# 1e-5 to 1e-4 without exponent ('0.00001' for '1e-05'). The output is only
+# tokenized again when it has an exponent or four zeros after a point, which
+# is cheaper to find, the strings with the same text only cost the second pass.
+_ORJSON_EXPONENT = re.compile(r"e-?\d")
+# The strings and the numbers of a compact JSON text
+_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?(?:e[-+]?\d+)?')
+
+
+def _normalize_float(match):
+    token = match.group()
+    if token[0] == '"' or ("e" not in token and "0.0000" not in token):
+        return token
+    return repr(float(token))
+
+
+def orjson_dumps(payload):
+    """
+    Serializes a payload in its compact canonical form with orjson,
+    with the same output as `json_dumps`.
+
+    The floats that orjson formats differently are formatted again as the
+    standard library does, only when the output can have any of them.
+    The values that orjson does not serialize, as integers of more than
+    64 bits, are serialized with the standard library. The payloads never
+    have NaN or infinite values, that orjson serializes as null.
+    """
+    try:
+        text = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    except TypeError:
+        return json_dumps(payload)
+    if ".0000" in text or _ORJSON_EXPONENT.search(text):
+        text = _JSON_TOKEN.sub(_normalize_float, text)
+    return text
+
+
+def orjson_loads(text):
+    """
+    Deserializes a payload with orjson.
+    """
+    return orjson.loads(text)
+
+
+# Backend used to serialize and deserialize the payloads: orjson when it is
+# installed, else the standard library.
+BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    dumps = orjson_dumps
+    loads = orjson_loads
+else:
+    dumps = json_dumps
+    loads = json_loads
+
+# orjson.JSONDecodeError is a subclass of it
+JSONDecodeError = json.JSONDecodeError
+
+
+def dumps_pretty(payload):
+    """
+    Serializes a payload indented, only for display.
+    """
+    return json.dumps(payload, indent=2, ensure_ascii=False)
+
+
+def add_members(text, members):
+    """
+    Appends members to the compact JSON text of an object, without
+    serializing the object again.
+
+    Args:
+        text (str): The compact JSON text of an object, as returned by `dumps`.
+        members (dict): The members to append. Their keys must not be in the object.
+
+    Returns:
+        str: The compact JSON text of the object with the members.
+    """
+    extra = dumps(members)[1:-1]
+    if not extra:
+        return text
+    if text == "{}":
+        return "{" + extra + "}"
+    return text[:-1] + "," + extra + "}"
+
+
+def encode_stored(payload, compress=False):
+    """
+    Returns the text stored in the 'edi_payload' fields for a payload.
+
+    Args:
+        payload (dict): The payload.
+        compress (bool): Whether the payload is stored compressed.
+
+    Returns:
+        str: The compact canonical JSON of the payload, or its zlib
+        compressed and base64 encoded form with the COMPRESSED_PREFIX.
+    """
+    return store_text(dumps(payload), compress)
+
+
+def store_text(text, compress=False):
+    """
+    Returns the text stored for the compact JSON text of a payload,
+    compressing it if needed.
+    """
+    if compress:
+        data = zlib.compress(text.encode("utf-8"), 6)
+        return COMPRESSED_PREFIX + base64.b64encode(data).decode("ascii")
+    return text
+
+
+def decode_stored(text):
+    """
+    Returns the JSON text of a stored payload, decompressing it if needed.
+
+    Raises:
+        ValueError: If the compressed payload is corrupted.
+    """
+    if text.startswith(COMPRESSED_PREFIX):
+        try:
+            data = base64.b64decode(text[len(COMPRESSED_PREFIX) :])
+            return zlib.decompress(data).decode("utf-8")
+        except zlib.error as e:
+            raise ValueError("Corrupted compressed payload: %s" % e) from e
+    return text
+
+
+def loads_stored(text):
+    """
+    Deserializes a payload stored with `encode_stored`, or with any JSON format.
+    """
+    return loads(decode_stored(text))
+
+
+def normalize_stored(text, compress=False):
+    """
+    Converts a stored JSON payload, in any format, to its stored canonical form.
+
+    Returns:
+        str: The canonical stored text, or None if the text is not JSON.
+    """
+    try:
+        payload = loads_stored(text)
+    except ValueError:
+        return None
+    return encode_stored(payload, compress)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+
+TABLE_START = "<table class='o_group o_inner_group o_group_col_12'><tbody>"
+TABLE_END = "</tbody></table><br/><br/>"
+ROW = (
+    "<tr><td class='o_td_label' style='width: 50%%;'><label class='o_form_label'><strong>"
+    "%s</strong></label></td>"
+    "<td class='text-right' style='width: 100%%;'><span class='o_field_char o_field_widget'>"
+    "%s</span></td><td/></tr>"
+)
+HEADING = "<h%d>%s</h%d>"
+
+
+def render_payload_html(
+    payload, tab, title="", field_names=None, code_models=None, code_names=None
+):
+    """
+    Converts a payload dictionary into an HTML table structure for rendering.
+
+    Every dictionary is traversed only once: its scalar values are rendered in
+    a table, followed by its dictionaries and then by its lists, and all the
+    fragments are written in list buffers that are joined at the end.
+
+    Args:
+        payload (dict): The payload dictionary to be converted.
+        tab (int): The heading level for the first level of the payload.
+        title (str, optional): The prefix of the field names of the payload.
+        field_names (dict, optional): The labels by field name or key.
+        code_models (dict, optional): The listing model by code field name or key.
+        code_names (dict, optional): The names by id of every listing model.
+
+    Returns:
+        str: The HTML representation of the payload.
+    """
+    out = []
+    _render(
+        payload,
+        tab,
+        title,
+        out,
+        field_names or {},
+        code_models or {},
+        code_names or {},
+    )
+    return "".join(out)
+
+
+def _render(payload, tab, title, out, field_names, code_models, code_names):
+    rows = []
+    dicts = []
+    lists = []
+    for key, value in payload.items():
+        field_name = title + "_" + key
+        if field_name in field_names:
+            label = field_names[field_name]
+        else:
+            label = field_names.get(key, field_name)
+        value_type = type(value)
+        if value_type == dict:
+            if key == "environment":
+                continue
+            dicts.append(HEADING % (tab, label, tab))
+            _render(
+                value, tab + 1, field_name, dicts, field_names, code_models, code_names
+            )
+        elif value_type == list:
+            lists.append(HEADING % (tab, label, tab))
+            for index, item in enumerate(value, 1):
+                lists.append(HEADING % (tab + 1, "%d. " % index, tab + 1))
+                _render(
+                    item,
+                    tab + 1,
+                    field_name,
+                    lists,
+                    field_names,
+                    code_models,
+                    code_names,
+                )
+        else:
+            if key == "sync":
+                continue
+            if key[-4:] == "code":
+                model_name = code_models.get(field_name) or code_models.get(key)
+                if model_name:
+                    value = code_names.get(model_name, {}).get(value, value)
+            rows.append(ROW % (label, value))
+    if rows:
+        out.append(TABLE_START)
+        out.extend(rows)
+        out.append(TABLE_END)
+    out.extend(dicts)
+    out.extend(lists)
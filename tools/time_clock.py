@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+#   payroll_dataico
+#   Copyright (C) 2023  Jorels SAS
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published
+#   by the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#   email: info@jorels.com
+#
+
+
+import csv
+import datetime as dt
+import itertools
+import json
+
+
+def read_punches(file, file_format="csv"):
+    """
+    Reads the punches of a time-clock export lazily, one at a time, so the
+    file is never loaded in memory.
+
+    Args:
+        file: A text file object.
+        file_format (str): 'csv', with a header, or 'jsonl', one JSON object
+        per line.
+
+    Yields:
+        tuple: The number of the line in the file and the punch as a dict.
+    """
+    if file_format == "jsonl":
+        for number, line in enumerate(file, 1):
+            line = line.strip()
+            if line:
+                yield number, json.loads(line)
+    elif file_format == "csv":
+        # The header is the line 1
+        for number, row in enumerate(csv.DictReader(file), 2):
+            yield number, row
+    else:
+        raise ValueError("Unknown time-clock format: %s" % file_format)
+
+
+def parse_datetime(value):
+    """
+    Returns the datetime of an ISO 8601 date and time, as '2024-01-31 18:30'.
+    """
+    if isinstance(value, dt.datetime):
+        return value
+    return dt.datetime.fromisoformat(str(value).strip())
+
+
+def to_hours(value):
+    """
+    Returns the time of a datetime as a number of hours, as the float time
+    fields of the earn lines.
+    """
+    return value.hour + value.minute / 60.0 + value.second / 3600.0
+
+
+def chunked(iterable, size):
+    """
+    Yields lists of up to `size` items of an iterable, consuming it lazily.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk